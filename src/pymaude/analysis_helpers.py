@@ -5,14 +5,146 @@ These functions operate on pandas DataFrames returned by MaudeDatabase query met
 They provide common analysis patterns to reduce boilerplate in notebooks.
 """
 
+import numpy as np
 import pandas as pd
+import sqlite3
 import matplotlib.pyplot as plt
 from typing import Dict, List, Optional, Union
+import functools
 import os
+import re
 
 
 # ==================== Internal Helper Functions ====================
 
+# FDA uses abbreviations: D=Death, IN=Injury, M=Malfunction
+# Full words are also matched for backwards compatibility
+EVENT_TYPE_PATTERNS = {
+    'deaths': r'\bD\b|Death',
+    'injuries': r'\bIN\b|Injury',
+    'malfunctions': r'\bM\b|Malfunction',
+}
+
+# Errors raised when an optional table needed by an enrichment is missing
+_TABLE_NOT_LOADED = {
+    'problems': "Problems table not loaded. Load with:\n"
+                "  db.add_years(years, tables=['problems'], download=True)\n"
+                "Note: problems table only available from 2019 onwards",
+    'patient': "Patient table not loaded. Load with:\n"
+               "  db.add_years(years, tables=['patient'], download=True)",
+    'text': "Text table not loaded. Load with:\n"
+            "  db.add_years(years, tables=['text'], download=True)",
+}
+
+
+def _parse_dates(dates):
+    """
+    Parse a date column, converting each distinct value only once.
+
+    MAUDE results repeat the same DATE_RECEIVED strings across many rows,
+    so the values are factorized first and only the uniques go through
+    pd.to_datetime; the parsed dates are then expanded back by code.
+
+    Args:
+        dates: Series of date strings (or datetimes)
+
+    Returns:
+        datetime64 Series aligned to dates, NaT where the value is missing
+    """
+    codes, uniques = pd.factorize(dates)
+    parsed = pd.to_datetime(uniques).take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(parsed, index=dates.index, name=dates.name)
+
+
+def _year_codes(dates):
+    """
+    Factorize the year of each date, parsing each distinct date only once.
+
+    Like _parse_dates, but the years are taken from the distinct dates and
+    only their codes are expanded back to the rows, so no per-row datetime
+    column is built.
+
+    Args:
+        dates: Series of date strings (or datetimes)
+
+    Returns:
+        Tuple of (codes, years): an integer code per row, -1 where the date is
+        missing, and the sorted distinct years the codes index into
+    """
+    codes, uniques = pd.factorize(dates)
+    unique_year_codes, years = pd.factorize(pd.to_datetime(uniques).year, sort=True)
+    if (codes < 0).any():
+        # Same dtype as Series.dt.year, which is float when any date is missing
+        years = years.astype('float64')
+    # Missing dates have code -1, which picks the appended -1
+    return np.append(unique_year_codes, -1)[codes], years
+
+
+def _event_type_codes(event_type):
+    """
+    Factorize EVENT_TYPE and flag each distinct value by event type.
+
+    EVENT_TYPE only takes a handful of distinct values, so the regexes run on
+    the uniques only; callers aggregate over the integer codes.
+
+    Args:
+        event_type: Series of EVENT_TYPE values (codes or full words)
+
+    Returns:
+        Tuple of (codes, flags): an integer code per row, and a boolean array
+        with one row per code and one column per EVENT_TYPE_PATTERNS entry.
+        Missing values get the last code, whose row is all False.
+    """
+    codes, uniques = pd.factorize(event_type)
+    uniques = pd.Series(uniques, dtype=object).astype(str)
+    codes[codes < 0] = len(uniques)
+
+    flags = np.zeros((len(uniques) + 1, len(EVENT_TYPE_PATTERNS)), dtype=bool)
+    for i, pattern in enumerate(EVENT_TYPE_PATTERNS.values()):
+        flags[:-1, i] = uniques.str.contains(pattern, case=False, regex=True).to_numpy(dtype=bool)
+    return codes, flags
+
+
+def _event_type_flags(event_type):
+    """
+    Flag each EVENT_TYPE value as death, injury and/or malfunction.
+
+    Computed once over the whole column so callers can aggregate the flags
+    (sum, groupby-sum) instead of re-running the regexes per group.
+
+    Args:
+        event_type: Series of EVENT_TYPE values (codes or full words)
+
+    Returns:
+        Boolean DataFrame with columns deaths, injuries, malfunctions,
+        aligned to event_type's index
+    """
+    codes, flags = _event_type_codes(event_type)
+    return pd.DataFrame(flags[codes], columns=list(EVENT_TYPE_PATTERNS), index=event_type.index)
+
+
+def _fetch_frame(conn, sql, params):
+    """
+    Run a query and build a DataFrame straight from the fetched tuples.
+
+    Equivalent to pd.read_sql_query for SQLite, without its per-call
+    pandas.io.sql setup. Used on the enrichment path, where many small
+    batched queries are issued back to back.
+
+    Args:
+        conn: SQLite database connection
+        sql: SQL statement with ? placeholders
+        params: Parameter values for the placeholders
+
+    Returns:
+        DataFrame with one column per result column
+    """
+    cursor = conn.execute(sql, params)
+    columns = [d[0] for d in cursor.description]
+    return pd.DataFrame.from_records(cursor.fetchall(), columns=columns,
+                                     coerce_float=True)
+
+
 def _batched_query_by_keys(db, table, columns, mdr_keys, batch_size=900):
     """
     Execute batched SQL queries to avoid SQLite variable limit.
@@ -29,6 +161,10 @@ def _batched_query_by_keys(db, table, columns, mdr_keys, batch_size=900):
 
     Returns:
         DataFrame with query results from all batches concatenated
+
+    Raises:
+        ValueError: If an enrichment table (see _TABLE_NOT_LOADED) no longer
+                   exists
     """
     if not mdr_keys:
         return pd.DataFrame()
@@ -37,14 +173,107 @@ def _batched_query_by_keys(db, table, columns, mdr_keys, batch_size=900):
     for i in range(0, len(mdr_keys), batch_size):
         batch_keys = mdr_keys[i:i + batch_size]
         placeholders = ','.join(['?'] * len(batch_keys))
-        batch_df = pd.read_sql_query(f"""
-            SELECT {columns}
-            FROM {table}
-            WHERE MDR_REPORT_KEY IN ({placeholders})
-        """, db.conn, params=batch_keys)
+        try:
+            batch_df = _fetch_frame(db.conn, f"""
+                SELECT {columns}
+                FROM {table}
+                WHERE MDR_REPORT_KEY IN ({placeholders})
+            """, batch_keys)
+        except sqlite3.OperationalError as e:
+            if 'no such table' not in str(e):
+                raise
+            # Dropped since _require_table last saw it (e.g. through db.conn
+            # or another connection): forget it and report it as not loaded
+            db._known_tables.discard(table)
+            if table not in _TABLE_NOT_LOADED:
+                raise
+            raise ValueError(_TABLE_NOT_LOADED[table]) from e
         result_dfs.append(batch_df)
 
-    return pd.concat(result_dfs, ignore_index=True) if result_dfs else pd.DataFrame()
+    if not result_dfs:
+        return pd.DataFrame()
+
+    return pd.concat(result_dfs, ignore_index=True)
+
+
+def _unique_report_keys(results_df):
+    """
+    Get the distinct, non-null MDR_REPORT_KEY values for use as SQL parameters.
+
+    Deduplication happens on the column's numpy values; conversion to Python
+    objects (required by sqlite3 parameter binding) is done once at the end.
+
+    Args:
+        results_df: DataFrame containing MDR_REPORT_KEY column
+
+    Returns:
+        List of unique report keys
+    """
+    return results_df['MDR_REPORT_KEY'].dropna().unique().tolist()
+
+
+@functools.lru_cache(maxsize=None)
+def _pyarrow_available():
+    """Check (once per process) whether the optional pyarrow package can be imported."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _to_arrow_strings(df, columns):
+    """
+    Store long text columns as Arrow-backed strings.
+
+    Narratives run to several kilobytes each; Arrow keeps them in one
+    contiguous buffer instead of one Python object per value. Only used when
+    the caller opts in with arrow_strings=True, since pyarrow is not a
+    required dependency.
+
+    Args:
+        df: DataFrame to convert (modified in place)
+        columns: Column names to convert; missing columns are skipped
+
+    Returns:
+        The same DataFrame
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    if not _pyarrow_available():
+        raise ImportError("arrow_strings=True requires pyarrow. Install with:\n"
+                          "  pip install pyarrow")
+
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype('string[pyarrow]')
+    return df
+
+
+def _require_table(db, table):
+    """
+    Raise ValueError unless table exists in the database.
+
+    Tables found on this instance are remembered in db._known_tables, so
+    repeated enrichment calls skip the catalog query. MaudeDatabase clears
+    that set whenever add_years() loads or deletes data. A table dropped
+    some other way (through db.conn or another connection) is caught by
+    _batched_query_by_keys, which forgets it and raises the same error.
+
+    Args:
+        db: MaudeDatabase instance
+        table: Table name to check (a key of _TABLE_NOT_LOADED)
+    """
+    if table in db._known_tables:
+        return
+
+    exists = db.conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    ).fetchone()
+    if exists is None:
+        raise ValueError(_TABLE_NOT_LOADED[table])
+    db._known_tables.add(table)
 
 
 # ==================== Existing Helper Methods (Moved from database.py) ====================
@@ -71,8 +300,8 @@ def get_narratives_for(db, results_df):
     if 'MDR_REPORT_KEY' not in results_df.columns:
         raise ValueError("DataFrame must contain 'MDR_REPORT_KEY' column")
 
-    keys = results_df['MDR_REPORT_KEY'].tolist()
-    return db.get_narratives(keys)
+    # Query each report once; device-level results repeat MDR_REPORT_KEY
+    return db.get_narratives(_unique_report_keys(results_df))
 
 
 def trends_for(results_df):
@@ -98,33 +327,37 @@ def trends_for(results_df):
     if missing:
         raise ValueError(f"DataFrame missing required columns: {missing}")
 
-    # Create a temporary copy with year extracted
     # Handle duplicate columns (e.g., when joining master and device tables)
-    df = results_df.copy()
     # Get the first DATE_RECEIVED column if there are duplicates
-    date_received = df['DATE_RECEIVED']
+    date_received = results_df['DATE_RECEIVED']
     if isinstance(date_received, pd.DataFrame):
         # Multiple DATE_RECEIVED columns - use the first one (from master table)
         date_received = date_received.iloc[:, 0]
-    df['year'] = pd.to_datetime(date_received).dt.year
 
     # Get EVENT_TYPE column, handling duplicates if they exist
-    event_type_col = df['EVENT_TYPE']
+    event_type_col = results_df['EVENT_TYPE']
     if isinstance(event_type_col, pd.DataFrame):
         # Multiple EVENT_TYPE columns - use the first one (from master table)
         event_type_col = event_type_col.iloc[:, 0]
-    df['event_type_clean'] = event_type_col
 
-    # Aggregate by year
-    # FDA uses abbreviations: D=Death, IN=Injury, M=Malfunction
-    trends = df.groupby('year').agg(
-        event_count=('year', 'size'),
-        deaths=('event_type_clean', lambda x: x.str.contains(r'\bD\b|Death', case=False, na=False, regex=True).sum()),
-        injuries=('event_type_clean', lambda x: x.str.contains(r'\bIN\b|Injury', case=False, na=False, regex=True).sum()),
-        malfunctions=('event_type_clean', lambda x: x.str.contains(r'\bM\b|Malfunction', case=False, na=False, regex=True).sum())
-    ).reset_index()
+    # Count reports per (year, distinct EVENT_TYPE) pair on integer codes, then
+    # weight each event type's flags by those counts. Rows without a parseable
+    # year are left out, as groupby would.
+    type_codes, flags = _event_type_codes(event_type_col)
+    year_codes, years = _year_codes(date_received)
+    has_year = year_codes >= 0
 
-    return trends
+    counts = np.bincount(year_codes[has_year] * len(flags) + type_codes[has_year],
+                         minlength=len(years) * len(flags)).reshape(len(years), len(flags))
+    type_counts = counts @ flags
+
+    return pd.DataFrame({
+        'year': years,
+        'event_count': counts.sum(axis=1),
+        'deaths': type_counts[:, 0],
+        'injuries': type_counts[:, 1],
+        'malfunctions': type_counts[:, 2],
+    })
 
 
 def event_type_breakdown_for(results_df):
@@ -156,38 +389,26 @@ def event_type_breakdown_for(results_df):
     if 'EVENT_TYPE' not in results_df.columns:
         raise ValueError("DataFrame must contain 'EVENT_TYPE' column")
 
+    event_type = results_df['EVENT_TYPE']
+    if isinstance(event_type, pd.DataFrame):
+        event_type = event_type.iloc[:, 0]
+
     # Count unique events (MDR_REPORT_KEY) to avoid double-counting multi-device events
     if 'MDR_REPORT_KEY' in results_df.columns:
-        # Get unique MDR_REPORT_KEYs with their EVENT_TYPE
         mdr_key = results_df['MDR_REPORT_KEY']
         if isinstance(mdr_key, pd.DataFrame):
             mdr_key = mdr_key.iloc[:, 0]
 
-        event_type = results_df['EVENT_TYPE']
-        if isinstance(event_type, pd.DataFrame):
-            event_type = event_type.iloc[:, 0]
+        # Keep the first row per report; a mask avoids building a deduplicated frame
+        event_type = event_type[~mdr_key.duplicated(keep='first').to_numpy()]
 
-        # Create a deduplicated DataFrame
-        unique_df = pd.DataFrame({
-            'MDR_REPORT_KEY': mdr_key,
-            'EVENT_TYPE': event_type
-        }).drop_duplicates(subset=['MDR_REPORT_KEY'])
+    # Fallback when MDR_REPORT_KEY is not available: count all rows
+    total = len(event_type)
 
-        total = len(unique_df)
-        event_type = unique_df['EVENT_TYPE'].fillna('')
-    else:
-        # Fallback: count all rows if MDR_REPORT_KEY not available
-        total = len(results_df)
-        event_type = results_df['EVENT_TYPE']
-        if isinstance(event_type, pd.DataFrame):
-            event_type = event_type.iloc[:, 0]
-        event_type = event_type.fillna('')
-
-    # FDA uses abbreviations: D=Death, IN=Injury, M=Malfunction
-    # Also check for full words for backwards compatibility
-    deaths = event_type.str.contains(r'\bD\b|Death', case=False, regex=True).sum()
-    injuries = event_type.str.contains(r'\bIN\b|Injury', case=False, regex=True).sum()
-    malfunctions = event_type.str.contains(r'\bM\b|Malfunction', case=False, regex=True).sum()
+    # Count rows per distinct EVENT_TYPE, then weight each type's flags by
+    # those counts rather than summing a flag per row
+    codes, flags = _event_type_codes(event_type)
+    deaths, injuries, malfunctions = np.bincount(codes, minlength=len(flags)) @ flags
 
     # Events can have multiple types, so other is approximate
     other = total - max(deaths, injuries, malfunctions)
@@ -221,7 +442,8 @@ def top_manufacturers_for(results_df, n=10):
     if 'MANUFACTURER_D_NAME' not in results_df.columns:
         raise ValueError("DataFrame must contain 'MANUFACTURER_D_NAME' column")
 
-    counts = results_df['MANUFACTURER_D_NAME'].value_counts().head(n)
+    # Partial selection of the n largest counts instead of sorting every manufacturer
+    counts = results_df['MANUFACTURER_D_NAME'].value_counts(sort=False).nlargest(n)
     return pd.DataFrame({
         'manufacturer': counts.index,
         'event_count': counts.values
@@ -258,7 +480,8 @@ def date_range_summary_for(results_df):
         # Multiple DATE_RECEIVED columns - use the first one
         date_received = date_received.iloc[:, 0]
 
-    dates = pd.to_datetime(date_received)
+    # Only the distinct dates matter for the range
+    dates = pd.to_datetime(pd.unique(date_received.dropna()))
     first = dates.min()
     last = dates.max()
 
@@ -296,19 +519,9 @@ def enrich_with_problems(db, results_df):
         raise ValueError("DataFrame must contain 'MDR_REPORT_KEY' column")
 
     # Check problems table exists (STRICT)
-    tables = pd.read_sql_query(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='problems'",
-        db.conn
-    )['name'].tolist()
+    _require_table(db, 'problems')
 
-    if 'problems' not in tables:
-        raise ValueError(
-            "Problems table not loaded. Load with:\n"
-            "  db.add_years(years, tables=['problems'], download=True)\n"
-            "Note: problems table only available from 2019 onwards"
-        )
-
-    mdr_keys = results_df['MDR_REPORT_KEY'].unique().tolist()
+    mdr_keys = _unique_report_keys(results_df)
 
     if not mdr_keys:
         return results_df
@@ -358,18 +571,9 @@ def enrich_with_patient_data(db, results_df):
         raise ValueError("DataFrame must contain 'MDR_REPORT_KEY' column")
 
     # Check patient table exists (STRICT)
-    tables = pd.read_sql_query(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='patient'",
-        db.conn
-    )['name'].tolist()
-
-    if 'patient' not in tables:
-        raise ValueError(
-            "Patient table not loaded. Load with:\n"
-            "  db.add_years(years, tables=['patient'], download=True)"
-        )
+    _require_table(db, 'patient')
 
-    mdr_keys = results_df['MDR_REPORT_KEY'].unique().tolist()
+    mdr_keys = _unique_report_keys(results_df)
 
     if not mdr_keys:
         return results_df
@@ -399,19 +603,22 @@ def enrich_with_patient_data(db, results_df):
     return enriched
 
 
-def enrich_with_narratives(db, results_df):
+def enrich_with_narratives(db, results_df, arrow_strings=False):
     """
     Join event narrative text to query results.
 
     Args:
         db: MaudeDatabase instance
         results_df: DataFrame from query_device() or similar
+        arrow_strings: If True, store FOI_TEXT as Arrow-backed strings
+                      (requires pyarrow; default: False)
 
     Returns:
         DataFrame with narrative column (FOI_TEXT) joined
 
     Raises:
         ValueError: If text table not loaded
+        ImportError: If arrow_strings=True and pyarrow is not installed
 
     Example:
         results = db.query_device(device_name='catheter', start_date='2023-01-01')
@@ -427,24 +634,17 @@ def enrich_with_narratives(db, results_df):
         raise ValueError("DataFrame must contain 'MDR_REPORT_KEY' column")
 
     # Check text table exists (STRICT)
-    tables = pd.read_sql_query(
-        "SELECT name FROM sqlite_master WHERE type='table' AND name='text'",
-        db.conn
-    )['name'].tolist()
+    _require_table(db, 'text')
 
-    if 'text' not in tables:
-        raise ValueError(
-            "Text table not loaded. Load with:\n"
-            "  db.add_years(years, tables=['text'], download=True)"
-        )
-
-    mdr_keys = results_df['MDR_REPORT_KEY'].unique().tolist()
+    mdr_keys = _unique_report_keys(results_df)
 
     if not mdr_keys:
         return results_df
 
     # Use batched query to avoid SQLite variable limit
     text = _batched_query_by_keys(db, 'text', 'MDR_REPORT_KEY, FOI_TEXT', mdr_keys)
+    if arrow_strings:
+        _to_arrow_strings(text, ['FOI_TEXT'])
 
     if db.verbose:
         print(f"Joined {len(text)} narrative texts")
@@ -496,15 +696,16 @@ def summarize_by_brand(results_df, group_column='search_group', include_temporal
     # Basic counts
     summary['counts'] = results_df[group_column].value_counts().to_dict()
 
-    # Event type breakdown
+    groups = results_df[group_column]
+
+    # Event type breakdown (one bincount over group x event type codes
+    # instead of a two-key groupby followed by unstack)
     if 'EVENT_TYPE' in results_df.columns:
-        summary['event_types'] = results_df.groupby(
-            [group_column, 'EVENT_TYPE']
-        ).size().unstack(fill_value=0)
+        summary['event_types'] = _crosstab_frame(groups, results_df['EVENT_TYPE'])
 
     # Date range
     if 'DATE_RECEIVED' in results_df.columns:
-        summary['date_range'] = results_df.groupby(group_column)['DATE_RECEIVED'].agg([
+        summary['date_range'] = results_df['DATE_RECEIVED'].groupby(groups).agg([
             ('first_report', 'min'),
             ('last_report', 'max'),
             ('total_reports', 'count')
@@ -512,11 +713,8 @@ def summarize_by_brand(results_df, group_column='search_group', include_temporal
 
     # Temporal trends
     if include_temporal and 'DATE_RECEIVED' in results_df.columns:
-        df_copy = results_df.copy()
-        df_copy['year'] = pd.to_datetime(df_copy['DATE_RECEIVED']).dt.year
-        summary['temporal'] = df_copy.groupby(
-            [group_column, 'year']
-        ).size().unstack(fill_value=0)
+        years = _parse_dates(results_df['DATE_RECEIVED']).dt.year.rename('year')
+        summary['temporal'] = _crosstab_frame(groups, years)
 
     return summary
 
@@ -792,11 +990,18 @@ def summarize_devices(df, columns=None):
         columns = ['BRAND_NAME', 'GENERIC_NAME', 'MANUFACTURER_D_NAME']
 
     # Only use columns that exist in the DataFrame
-    available_cols = [c for c in columns if c in df.columns]
+    col_set = set(df.columns)
+    available_cols = [c for c in columns if c in col_set]
 
     if not available_cols:
         raise ValueError(f"None of the specified columns found in DataFrame. Available: {list(df.columns)}")
 
+    if len(available_cols) == 1:
+        # Single column: hash-based unique avoids building a one-column frame
+        col = available_cols[0]
+        values = pd.Series(df[col].unique(), name=col).sort_values(na_position='last')
+        return values.reset_index(drop=True).to_frame()
+
     result = df[available_cols].drop_duplicates()
 
     if len(available_cols) > 0:
@@ -807,6 +1012,104 @@ def summarize_devices(df, columns=None):
 
 # ==================== Brand Standardization Helpers ====================
 
+@functools.lru_cache(maxsize=64)
+def _compile_patterns(patterns):
+    """
+    Compile mapping patterns into one first-match regex (cached).
+
+    (?=.*?(p1))|(?=.*?(p2))|... tries each pattern against the whole string
+    in order; the match's lastindex identifies which one succeeded. Mappings
+    are typically reused across calls, so the compiled regex is memoized on
+    the pattern tuple.
+
+    Args:
+        patterns: Tuple of substring patterns, in priority order
+
+    Returns:
+        Compiled regex to be used with .match() on lowercased text
+    """
+    return re.compile(
+        '|'.join(f'(?=.*?({re.escape(pattern.lower())}))' for pattern in patterns),
+        re.DOTALL
+    )
+
+
+def _lowercase_names(values):
+    """
+    Lowercase a column of names, converting each distinct value only once.
+
+    Done once per column before matching, so callers that run several
+    mapping levels over the same names share the lowercased values, and case
+    variants of a name collapse to one value to match.
+
+    Args:
+        values: Series of names (may contain missing values)
+
+    Returns:
+        Object Series aligned to values, with None where the name is missing
+    """
+    codes, uniques = pd.factorize(values)
+    lowered = np.array([str(value).lower() for value in uniques] + [None], dtype=object)
+    return pd.Series(lowered[codes], index=values.index, dtype=object)
+
+
+def _match_first_pattern(values, mapping):
+    """
+    Map each value to the standard name of the first mapping pattern it contains.
+
+    Matching is case-insensitive substring matching where the first pattern
+    in dict order wins. All patterns are compiled into one regex of ordered
+    lookaheads, so each distinct value is matched in a single call, and
+    repeated values (brand names repeat heavily across reports) are only
+    matched once.
+
+    Args:
+        values: Series of lowercased strings to match (see _lowercase_names)
+        mapping: Dict mapping patterns to standard names
+
+    Returns:
+        Tuple of (names, matched): an object Series aligned to values holding
+        the standard name of the matching pattern (None where nothing
+        matched), and a boolean Series marking which values matched. The
+        mask is needed because a pattern may map to a falsy name ('' or None)
+    """
+    if not mapping:
+        return (pd.Series([None] * len(values), index=values.index, dtype=object),
+                pd.Series(False, index=values.index))
+
+    regex = _compile_patterns(tuple(mapping))
+    standard_names = list(mapping.values())
+
+    matches = {}
+    for value in values.dropna().unique():
+        m = regex.match(value)
+        if m is not None:
+            matches[value] = m.lastindex - 1
+
+    positions = values.map(matches)
+    matched = positions.notna()
+    names = np.full(len(values), None, dtype=object)
+    names[matched.to_numpy()] = [standard_names[int(i)] for i in positions[matched]]
+    return pd.Series(names, index=values.index, dtype=object), matched
+
+
+def _match_truthy(values, mapping):
+    """
+    Like _match_first_pattern, but a pattern mapped to a falsy name ('' or
+    None) leaves the value unmatched, as hierarchical_brand_standardization
+    has always treated it.
+
+    Args:
+        values: Series of lowercased strings to match (see _lowercase_names)
+        mapping: Dict mapping patterns to standard names
+
+    Returns:
+        Object Series aligned to values, with None where nothing usable matched
+    """
+    names, matched = _match_first_pattern(values, mapping)
+    return names.where(matched & names.astype(bool), None)
+
+
 def standardize_brand_names(results_df, mapping_dict,
                             source_col='BRAND_NAME',
                             target_col='standard_brand'):
@@ -833,16 +1136,13 @@ def standardize_brand_names(results_df, mapping_dict,
     if source_col not in results_df.columns:
         raise ValueError(f"DataFrame must contain '{source_col}' column")
 
-    def standardize(brand_name):
-        if pd.isna(brand_name):
-            return None
-        brand_lower = str(brand_name).lower()
-        for pattern, standard_name in mapping_dict.items():
-            if pattern.lower() in brand_lower:
-                return standard_name
-        return brand_name  # Keep original if no match
+    brand_names = results_df[source_col]
+    names, matched = _match_first_pattern(_lowercase_names(brand_names), mapping_dict)
 
-    results_df[target_col] = results_df[source_col].apply(standardize)
+    # Keep original if no match (a pattern mapped to '' or None still counts
+    # as a match); missing brand names stay None
+    standardized = names.where(matched, brand_names)
+    results_df[target_col] = standardized.where(brand_names.notna(), None).infer_objects()
     return results_df
 
 
@@ -878,7 +1178,7 @@ def hierarchical_brand_standardization(results_df,
         manufacturer_col: Column to use for manufacturer matching (default: 'MANUFACTURER_D_NAME')
 
     Returns:
-        DataFrame with three new columns added:
+        New DataFrame (the input is not modified) with three new columns added:
         - device_model: Most specific match (from specific_mapping or family_mapping)
         - device_family: Family-level grouping (from family_mapping if available)
         - manufacturer: Manufacturer name (from manufacturer_mapping if available)
@@ -922,77 +1222,117 @@ def hierarchical_brand_standardization(results_df,
     if manufacturer_mapping is not None and manufacturer_col not in results_df.columns:
         raise ValueError(f"DataFrame must contain '{manufacturer_col}' column for manufacturer matching")
 
-    # Create a copy to avoid modifying the original
-    df = results_df.copy()
+    # Work on a positional index so duplicate index labels can't misalign
+    # Lowercase once up front; every brand-name level matches against it
+    brand_names = _lowercase_names(results_df[source_col].reset_index(drop=True))
+    model = pd.Series([None] * len(results_df), dtype=object)
+    family = pd.Series([None] * len(results_df), dtype=object)
+    manufacturer = pd.Series([None] * len(results_df), dtype=object)
+
+    # Level 1: Try specific mapping
+    if specific_mapping:
+        model = _match_truthy(brand_names, specific_mapping)
+        if family_mapping:
+            # Set family from the brand name first; failing that, check whether
+            # the specific model belongs to a family (e.g., "FlowTriever T16"
+            # belongs to "FlowTriever family")
+            has_specific = model.notna()
+            family_of_brand = _match_truthy(brand_names[has_specific], family_mapping)
+            family_of_model, _ = _match_first_pattern(_lowercase_names(model[has_specific]),
+                                                      family_mapping)
+            family[has_specific] = family_of_brand.where(
+                family_of_brand.notna(), family_of_model
+            )
+
+    # Level 2: Try family mapping (only if no specific match found)
+    if family_mapping:
+        unmatched = model.isna()
+        family_match = _match_truthy(brand_names[unmatched], family_mapping)
+        matched = family_match.notna()
+
+        # For device_model, append (unspecified) to clarify this is a family-level match
+        # But don't add it if already present
+        def family_model_name(name):
+            if '(family)' in name.lower():
+                # Remove existing (family) suffix and add (family - unspecified)
+                return name.replace('(family)', '(family - unspecified)').replace('(Family)', '(family - unspecified)')
+            if '(unspecified)' in name.lower():
+                # Already has (unspecified), use as-is
+                return name
+            # Add (unspecified) suffix
+            return f"{name} (unspecified)"
+
+        family_index = family_match.index[matched]
+        model[family_index] = family_match[matched].map(family_model_name)
+        family[family_index] = family_match[matched]
+
+    # Level 3: Try manufacturer mapping (uses manufacturer_col, not brand_name)
+    if manufacturer_mapping:
+        manufacturer = _match_truthy(_lowercase_names(results_df[manufacturer_col]),
+                                     manufacturer_mapping)
+
+    # Keep object dtype so unmatched rows stay None rather than NaN
+    def as_column(matches):
+        values = np.where(matches.notna(), matches.to_numpy(dtype=object), None)
+        return pd.Series(values, index=results_df.index, dtype=object)
+
+    # assign() returns a new frame, so the caller's DataFrame is left
+    # unmodified. Under copy-on-write (pandas >= 3.0, or opted into on 2.x)
+    # the existing columns are shared; older pandas deep-copies them
+    return results_df.assign(
+        device_model=as_column(model),
+        device_family=as_column(family),
+        manufacturer=as_column(manufacturer)
+    )
 
-    # Initialize result columns
-    df['device_model'] = None
-    df['device_family'] = None
-    df['manufacturer'] = None
-
-    # Helper function to match a single brand name against a mapping
-    def find_match(brand_name, mapping):
-        if pd.isna(brand_name) or mapping is None:
-            return None
-        brand_lower = str(brand_name).lower()
-        for pattern, standard_name in mapping.items():
-            if pattern.lower() in brand_lower:
-                return standard_name
-        return None
-
-    # Process each row
-    for idx, row in df.iterrows():
-        brand_name = row[source_col]
-
-        # Level 1: Try specific mapping
-        if specific_mapping:
-            specific_match = find_match(brand_name, specific_mapping)
-            if specific_match:
-                df.at[idx, 'device_model'] = specific_match
-                # Also set family if we can derive it from family_mapping
-                # Try matching against the brand_name first
-                if family_mapping:
-                    family_match = find_match(brand_name, family_mapping)
-                    if family_match:
-                        df.at[idx, 'device_family'] = family_match
-                    else:
-                        # If brand_name doesn't match family pattern, try matching
-                        # against all family patterns to see if the specific model
-                        # belongs to any family (e.g., "FlowTriever T16" belongs to "FlowTriever family")
-                        for pattern, family_name in family_mapping.items():
-                            if pattern.lower() in specific_match.lower():
-                                df.at[idx, 'device_family'] = family_name
-                                break
-
-        # Level 2: Try family mapping (only if no specific match found)
-        if family_mapping and df.at[idx, 'device_model'] is None:
-            family_match = find_match(brand_name, family_mapping)
-            if family_match:
-                # For device_model, append (unspecified) to clarify this is a family-level match
-                # But don't add it if already present
-                if '(family)' in family_match.lower():
-                    # Remove existing (family) suffix and add (family - unspecified)
-                    model_name = family_match.replace('(family)', '(family - unspecified)').replace('(Family)', '(family - unspecified)')
-                elif '(unspecified)' in family_match.lower():
-                    # Already has (unspecified), use as-is
-                    model_name = family_match
-                else:
-                    # Add (unspecified) suffix
-                    model_name = f"{family_match} (unspecified)"
-                df.at[idx, 'device_model'] = model_name
-                df.at[idx, 'device_family'] = family_match
-
-        # Level 3: Try manufacturer mapping (uses manufacturer_col, not brand_name)
-        if manufacturer_mapping:
-            manufacturer_name = row[manufacturer_col]
-            mfr_match = find_match(manufacturer_name, manufacturer_mapping)
-            if mfr_match:
-                df.at[idx, 'manufacturer'] = mfr_match
 
-    return df
+# ==================== Statistical Analysis Methods ====================
 
+def _crosstab_counts(row_values, col_values):
+    """
+    Count co-occurrences of two variables as a plain numpy matrix.
+
+    Both variables are factorized to integer codes (labels sorted, as
+    pd.crosstab does) and counted with a single bincount over the combined
+    code, skipping crosstab's groupby/pivot machinery. Rows missing either
+    value are ignored, as in pd.crosstab.
+
+    Args:
+        row_values: Series for the table rows
+        col_values: Series for the table columns
+
+    Returns:
+        Tuple of (counts ndarray, row labels Index, column labels Index)
+    """
+    present = (row_values.notna() & col_values.notna()).to_numpy()
+    row_codes, row_labels = pd.factorize(row_values[present], sort=True)
+    col_codes, col_labels = pd.factorize(col_values[present], sort=True)
+
+    n_rows, n_cols = len(row_labels), len(col_labels)
+    counts = np.bincount(row_codes * n_cols + col_codes, minlength=n_rows * n_cols)
+    return counts.reshape(n_rows, n_cols), row_labels, col_labels
+
+
+def _crosstab_frame(row_values, col_values):
+    """
+    Count co-occurrences of two variables as a labelled DataFrame.
+
+    Same result as pd.crosstab(row_values, col_values) (and as
+    groupby([row, col]).size().unstack(fill_value=0)), built from
+    _crosstab_counts.
+
+    Args:
+        row_values: Series for the table rows; its name labels the index
+        col_values: Series for the table columns; its name labels the columns
+
+    Returns:
+        DataFrame of int64 counts
+    """
+    observed, row_labels, col_labels = _crosstab_counts(row_values, col_values)
+    return pd.DataFrame(observed,
+                        index=row_labels.rename(row_values.name),
+                        columns=col_labels.rename(col_values.name))
 
-# ==================== Statistical Analysis Methods ====================
 
 def create_contingency_table(results_df, row_var, col_var, normalize=False):
     """
@@ -1017,12 +1357,15 @@ def create_contingency_table(results_df, row_var, col_var, normalize=False):
     if col_var not in results_df.columns:
         raise ValueError(f"DataFrame must contain '{col_var}' column")
 
-    # Create contingency table
-    counts = pd.crosstab(results_df[row_var], results_df[col_var])
+    # Create contingency table from integer codes rather than pd.crosstab
+    counts = _crosstab_frame(results_df[row_var], results_df[col_var])
 
     if normalize:
         # Row-wise percentages (sum to 100% per row)
-        percentages = counts.div(counts.sum(axis=1), axis=0) * 100
+        observed = counts.to_numpy()
+        row_totals = observed.sum(axis=1, keepdims=True)
+        percentages = pd.DataFrame(observed / row_totals * 100,
+                                   index=counts.index, columns=counts.columns)
         return {
             'counts': counts,
             'percentages': percentages
@@ -1048,25 +1391,51 @@ def chi_square_test(results_df, row_var, col_var, exclude_cols=None):
         result = chi_square_test(df, 'brand', 'problem_category', exclude_cols=['Uncategorized'])
         print(f"Chi-square: {result['chi2_statistic']:.2f}, p={result['p_value']:.4f}")
     """
-    from scipy.stats import chi2_contingency
+    if row_var not in results_df.columns:
+        raise ValueError(f"DataFrame must contain '{row_var}' column")
+    if col_var not in results_df.columns:
+        raise ValueError(f"DataFrame must contain '{col_var}' column")
 
-    # Create contingency table
-    contingency = create_contingency_table(results_df, row_var, col_var)
+    # Create contingency table as a plain array; labels are only needed
+    # to wrap the expected frequencies at the end
+    observed, row_labels, col_labels = _crosstab_counts(
+        results_df[row_var], results_df[col_var]
+    )
 
     # Exclude specified columns
     if exclude_cols:
-        contingency = contingency.drop(columns=exclude_cols, errors='ignore')
+        keep = ~col_labels.isin(exclude_cols)
+        observed = observed[:, keep]
+        col_labels = col_labels[keep]
+
+    return _chi_square_from_counts(observed, row_labels.rename(row_var),
+                                   col_labels.rename(col_var))
+
+
+def _chi_square_from_counts(observed, row_labels, col_labels):
+    """
+    Run chi2_contingency on an observed count matrix and package the result.
+
+    Args:
+        observed: 2-D array of counts
+        row_labels: Index labelling the rows of observed
+        col_labels: Index labelling the columns of observed
+
+    Returns:
+        dict in the format returned by chi_square_test()
+    """
+    from scipy.stats import chi2_contingency
 
     # Perform chi-square test
-    chi2, p_value, dof, expected = chi2_contingency(contingency)
+    chi2, p_value, dof, expected = chi2_contingency(observed)
 
     return {
         'chi2_statistic': float(chi2),
         'p_value': float(p_value),
         'dof': int(dof),
         'expected_frequencies': pd.DataFrame(expected,
-                                             index=contingency.index,
-                                             columns=contingency.columns),
+                                             index=row_labels,
+                                             columns=col_labels),
         'significant': p_value < 0.05
     }
 
@@ -1103,36 +1472,38 @@ def event_type_comparison(results_df, group_var='search_group'):
     unique_df = results_df.drop_duplicates(subset=['MDR_REPORT_KEY'], keep='first')
 
     # Extract event type flags
-    unique_df = unique_df.copy()
-    event_type_str = unique_df['EVENT_TYPE'].fillna('')
-    unique_df['has_death'] = event_type_str.str.contains(r'\bD\b|Death', case=False, regex=True)
-    unique_df['has_injury'] = event_type_str.str.contains(r'\bIN\b|Injury', case=False, regex=True)
-    unique_df['has_malfunction'] = event_type_str.str.contains(r'\bM\b|Malfunction', case=False, regex=True)
-
-    # Count by group
-    counts = unique_df.groupby(group_var).agg({
-        'MDR_REPORT_KEY': 'count',
-        'has_death': 'sum',
-        'has_injury': 'sum',
-        'has_malfunction': 'sum'
-    }).rename(columns={
-        'MDR_REPORT_KEY': 'total',
-        'has_death': 'deaths',
-        'has_injury': 'injuries',
-        'has_malfunction': 'malfunctions'
-    })
+    flags = _event_type_flags(unique_df['EVENT_TYPE'].fillna(''))
+
+    # Count by group: factorize the groups once and bincount each flag
+    # column, rather than a groupby over copied flag columns
+    group_codes, groups = pd.factorize(unique_df[group_var], sort=True)
+    in_group = group_codes >= 0
+    group_codes = group_codes[in_group]
+    n_groups = len(groups)
+
+    def count_per_group(weights):
+        return np.bincount(group_codes, weights=weights[in_group],
+                           minlength=n_groups).astype(np.int64)
+
+    counts = pd.DataFrame(
+        {'total': count_per_group(unique_df['MDR_REPORT_KEY'].notna().to_numpy())},
+        index=groups.rename(group_var)
+    )
+    for name in EVENT_TYPE_PATTERNS:
+        counts[name] = count_per_group(flags[name].to_numpy())
 
     # Calculate percentages
     percentages = counts[['deaths', 'injuries', 'malfunctions']].div(counts['total'], axis=0) * 100
 
-    # Chi-square test on event types
-    # Create binary columns for each event type
-    chi2_df = unique_df[[group_var, 'has_death', 'has_injury', 'has_malfunction']].copy()
-    chi2_df_long = pd.melt(chi2_df, id_vars=[group_var],
-                           value_vars=['has_death', 'has_injury', 'has_malfunction'],
-                           var_name='event_type', value_name='has_event')
-    chi2_df_long = chi2_df_long[chi2_df_long['has_event']]  # Only True values
-    chi2_result = chi_square_test(chi2_df_long, group_var, 'event_type')
+    # Chi-square test on event types: the per-group flag counts are the
+    # observed table. Groups and event types with no events are left out.
+    observed = counts[['deaths', 'injuries', 'malfunctions']].to_numpy()
+    event_labels = pd.Index(['has_death', 'has_injury', 'has_malfunction'], name='event_type')
+    row_mask = observed.sum(axis=1) > 0
+    col_mask = observed.sum(axis=0) > 0
+    chi2_result = _chi_square_from_counts(
+        observed[row_mask][:, col_mask], counts.index[row_mask], event_labels[col_mask]
+    )
 
     # Generate summary text
     summary_lines = [
@@ -1141,11 +1512,11 @@ def event_type_comparison(results_df, group_var='search_group'):
         f"Chi-square: {chi2_result['chi2_statistic']:.2f} (p={chi2_result['p_value']:.4f})",
         ""
     ]
-    for group in percentages.index:
-        pcts = percentages.loc[group]
+    # Plain tuples per group rather than a .loc row Series for each one
+    for group, deaths, injuries, malfunctions in percentages.itertuples(name=None):
         summary_lines.append(
-            f"{group}: {pcts['deaths']:.1f}% deaths, {pcts['injuries']:.1f}% injuries, "
-            f"{pcts['malfunctions']:.1f}% malfunctions"
+            f"{group}: {deaths:.1f}% deaths, {injuries:.1f}% injuries, "
+            f"{malfunctions:.1f}% malfunctions"
         )
 
     return {
@@ -1420,18 +1791,19 @@ def count_unique_events(results_df, event_key_col='EVENT_KEY'):
 
     total_reports = len(results_df)
 
-    # Count unique non-null EVENT_KEYs
-    unique_non_null_events = results_df[event_key_col].nunique()
+    # One sorted factorize gives every count below; nulls get code -1
+    codes, event_keys = pd.factorize(results_df[event_key_col], sort=True)
+    is_null = codes < 0
 
     # Count null EVENT_KEYs (each null represents a unique event)
-    null_count = results_df[event_key_col].isna().sum()
+    null_count = int(is_null.sum())
 
     # Total unique events = non-null unique EVENT_KEYs + each null EVENT_KEY
-    unique_events = unique_non_null_events + null_count
+    unique_events = len(event_keys) + null_count
 
     # Find EVENT_KEYs with multiple reports (exclude nulls)
-    event_counts = results_df[results_df[event_key_col].notna()].groupby(event_key_col).size()
-    multi_report_events = event_counts[event_counts > 1].index.tolist()
+    event_counts = np.bincount(codes[~is_null], minlength=len(event_keys))
+    multi_report_events = event_keys[event_counts > 1].tolist()
 
     # Calculate duplication rate
     duplicates = total_reports - unique_events
@@ -1476,18 +1848,53 @@ def detect_multi_report_events(results_df, event_key_col='EVENT_KEY'):
     if 'MDR_REPORT_KEY' not in results_df.columns:
         raise ValueError("Column 'MDR_REPORT_KEY' not found in DataFrame")
 
-    # Group by EVENT_KEY and count reports
-    grouped = results_df.groupby(event_key_col).agg(
-        report_count=('MDR_REPORT_KEY', 'size'),
-        mdr_report_keys=('MDR_REPORT_KEY', lambda x: list(x))
-    ).reset_index()
-
-    # Filter to only multi-report events
-    multi_reports = grouped[grouped['report_count'] > 1].copy()
+    # Count reports per EVENT_KEY on integer codes, then collect report keys
+    # only for the events that have more than one report
+    codes, event_keys = pd.factorize(results_df[event_key_col], sort=True)
+    report_counts = np.bincount(codes[codes >= 0], minlength=len(event_keys))
+    multi_codes = np.flatnonzero(report_counts > 1)
+
+    in_multi = np.zeros(len(event_keys) + 1, dtype=bool)
+    in_multi[multi_codes] = True
+    rows = np.flatnonzero(in_multi[codes])  # code -1 hits the trailing False
+    rows = rows[np.argsort(codes[rows], kind='stable')]
+    mdr_keys = results_df['MDR_REPORT_KEY'].to_numpy(dtype=object)[rows].tolist()
+    bounds = np.cumsum(report_counts[multi_codes])
+
+    multi_reports = pd.DataFrame({
+        event_key_col: event_keys[multi_codes],
+        'report_count': report_counts[multi_codes],
+        'mdr_report_keys': [mdr_keys[start:stop] for start, stop
+                            in zip(np.r_[0, bounds[:-1]], bounds)],
+    })
 
     return multi_reports.sort_values('report_count', ascending=False).reset_index(drop=True)
 
 
+def _primary_report_positions(event_keys, preference, ascending):
+    """
+    Find the position of the preferred report for each event.
+
+    Only the key and preference columns are sorted (not the whole results
+    frame); the first row per key after sorting wins, with ties going to the
+    earlier row. Rows with a missing key are left out.
+
+    Args:
+        event_keys: Series of EVENT_KEY values
+        preference: Series aligned to event_keys to rank reports by
+        ascending: Whether smaller preference values win
+
+    Returns:
+        Array of row positions, one per event, ordered by EVENT_KEY
+    """
+    codes, _ = pd.factorize(event_keys, sort=True)
+    order = pd.DataFrame({'key': codes, 'preference': preference.to_numpy()})
+    order = order[order['key'] >= 0].sort_values(
+        ['key', 'preference'], ascending=[True, ascending], na_position='last'
+    )
+    return order.index[~order['key'].duplicated()].to_numpy()
+
+
 def select_primary_report(results_df, event_key_col='EVENT_KEY',
                           strategy='first_received'):
     """
@@ -1527,33 +1934,33 @@ def select_primary_report(results_df, event_key_col='EVENT_KEY',
             raise ValueError("Strategy 'first_received' requires DATE_RECEIVED column")
 
         # Convert to datetime if needed
-        df = results_df.copy()
-        if not pd.api.types.is_datetime64_any_dtype(df['DATE_RECEIVED']):
-            df['DATE_RECEIVED'] = pd.to_datetime(df['DATE_RECEIVED'], errors='coerce')
+        date_received = results_df['DATE_RECEIVED']
+        if not pd.api.types.is_datetime64_any_dtype(date_received):
+            date_received = pd.to_datetime(date_received, errors='coerce')
 
-        # Sort by EVENT_KEY and DATE_RECEIVED, then take first
-        df_sorted = df.sort_values([event_key_col, 'DATE_RECEIVED'])
-        deduplicated = df_sorted.groupby(event_key_col, as_index=False).first()
+        # Earliest DATE_RECEIVED first
+        positions = _primary_report_positions(results_df[event_key_col], date_received,
+                                              ascending=True)
+        deduplicated = results_df.take(positions)
+        deduplicated['DATE_RECEIVED'] = date_received.to_numpy()[positions]
 
     elif strategy == 'manufacturer':
         if 'REPORT_SOURCE_CODE' not in results_df.columns:
             # Fallback to first_received if column missing
             return select_primary_report(results_df, event_key_col, 'first_received')
 
-        df = results_df.copy()
         # Prefer manufacturer reports, then take first by any tie-breaker
-        df['is_manufacturer'] = df['REPORT_SOURCE_CODE'].str.lower().str.contains('manufacturer', na=False)
-        df_sorted = df.sort_values([event_key_col, 'is_manufacturer'], ascending=[True, False])
-        deduplicated = df_sorted.groupby(event_key_col, as_index=False).first()
-        deduplicated = deduplicated.drop(columns=['is_manufacturer'])
+        is_manufacturer = results_df['REPORT_SOURCE_CODE'].str.lower().str.contains('manufacturer', na=False)
+        positions = _primary_report_positions(results_df[event_key_col], is_manufacturer,
+                                              ascending=False)
+        deduplicated = results_df.take(positions)
 
     elif strategy == 'most_complete':
-        df = results_df.copy()
         # Count non-null fields per row
-        df['_completeness'] = df.notna().sum(axis=1)
-        df_sorted = df.sort_values([event_key_col, '_completeness'], ascending=[True, False])
-        deduplicated = df_sorted.groupby(event_key_col, as_index=False).first()
-        deduplicated = deduplicated.drop(columns=['_completeness'])
+        completeness = pd.Series(results_df.notna().to_numpy().sum(axis=1), index=results_df.index)
+        positions = _primary_report_positions(results_df[event_key_col], completeness,
+                                              ascending=False)
+        deduplicated = results_df.take(positions)
 
     else:
         raise ValueError(f"Unknown strategy: {strategy}. "
@@ -1610,18 +2017,17 @@ def compare_report_vs_event_counts(results_df, event_key_col='EVENT_KEY',
         if group_by not in results_df.columns:
             raise ValueError(f"Column '{group_by}' not found in DataFrame")
 
-        # Group-wise comparison
-        # Need to handle null EVENT_KEYs properly (each null is unique)
-        def count_unique_with_nulls(series):
-            """Count unique values treating each null as unique."""
-            non_null_unique = series.nunique()
-            null_count = series.isna().sum()
-            return non_null_unique + null_count
-
-        grouped = results_df.groupby(group_by).agg({
-            'MDR_REPORT_KEY': 'count',  # Total reports
-            event_key_col: count_unique_with_nulls  # Unique events (nulls are unique)
-        }).reset_index()
+        # Group-wise comparison on integer EVENT_KEY codes. Each null
+        # EVENT_KEY gets its own negative code so it counts as a unique event.
+        codes, _ = pd.factorize(results_df[event_key_col])
+        is_null = codes < 0
+        codes[is_null] = -1 - np.arange(is_null.sum())
+        event_codes = pd.Series(codes, index=results_df.index)
+
+        grouped = pd.concat([
+            results_df['MDR_REPORT_KEY'].groupby(results_df[group_by]).count(),  # Total reports
+            event_codes.groupby(results_df[group_by]).nunique(),  # Unique events (nulls are unique)
+        ], axis=1).reset_index()
 
         grouped.columns = [group_by, 'report_count', 'event_count']
 
@@ -24,16 +24,32 @@ FDA MAUDE (Manufacturer and User Facility Device Experience) database.
 import pandas as pd
 import sqlite3
 import os
+import time
 from datetime import datetime
 import requests
 import zipfile
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
+import mmap
 
 from .metadata import TABLE_METADATA, FDA_BASE_URL
 from . import processors
 from . import analysis_helpers
 
+# Read size used when hashing source files (8 MB)
+CHECKSUM_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Files at least this large are hashed through mmap instead of read calls (64 MB)
+CHECKSUM_MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# Files modified more recently than this (ns) are always rehashed, since a
+# rewrite within the filesystem's timestamp resolution may not change mtime
+FINGERPRINT_MIN_AGE_NS = 2 * 1_000_000_000
+
+# Upper bound on source files hashed at the same time by add_years
+CHECKSUM_MAX_WORKERS = 8
+
 
 class MaudeDatabase:
     """
@@ -56,7 +72,7 @@ class MaudeDatabase:
         db.update(add_new_years=False)
     """
 
-    def __init__(self, db_path, verbose=True):
+    def __init__(self, db_path, verbose=True, wal=False):
         """
         Initialize connection to MAUDE database.
         Creates new database if doesn't exist, connects to existing if it does.
@@ -64,6 +80,10 @@ class MaudeDatabase:
         Args:
             db_path: Path to SQLite database file
             verbose: Whether to print progress messages
+            wal: If True, switch the database to write-ahead logging with
+                 synchronous=NORMAL: far fewer fsyncs per commit while staying
+                 crash-safe. The mode is stored in the database file and
+                 creates -wal/-shm files next to it (default: False)
         """
         self.db_path = db_path
         self.verbose = verbose
@@ -73,7 +93,16 @@ class MaudeDatabase:
         # This helps handle large text fields in MAUDE data
         self.conn.execute("PRAGMA max_length = 1073741824")  # 1GB
 
+        # Larger pages keep long narrative rows in fewer overflow pages. Only
+        # takes effect for a new, empty database, so must come before WAL
+        self.conn.execute("PRAGMA page_size = 8192")
+
+        if wal:
+            self.conn.execute("PRAGMA journal_mode = WAL")
+            self.conn.execute("PRAGMA synchronous = NORMAL")
+
         self._download_cache = set()  # Track downloaded files to avoid re-downloading
+        self._known_tables = set()  # Tables confirmed to exist (see analysis_helpers._require_table)
         self.TABLE_METADATA = TABLE_METADATA
         self.base_url = FDA_BASE_URL
 
@@ -106,9 +135,18 @@ class MaudeDatabase:
                 file_checksum TEXT NOT NULL,
                 loaded_at TIMESTAMP NOT NULL,
                 row_count INTEGER,
+                file_size INTEGER,
+                file_mtime_ns INTEGER,
                 PRIMARY KEY (table_name, year)
             )
         """)
+
+        # Databases created before file fingerprints were tracked
+        cursor = self.conn.execute("PRAGMA table_info(_maude_load_metadata)")
+        columns = {row[1] for row in cursor.fetchall()}
+        for column in ('file_size', 'file_mtime_ns'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE _maude_load_metadata ADD COLUMN {column} INTEGER")
         self.conn.commit()
 
 
@@ -127,14 +165,113 @@ class MaudeDatabase:
 
         sha256_hash = hashlib.sha256()
 
-        # Read file in chunks to handle large files efficiently
-        with open(filepath, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096 * 1024), b''):  # 4MB chunks
-                sha256_hash.update(chunk)
+        # Large files: hash straight from the page cache via mmap, skipping the
+        # copy into a userspace buffer and letting the kernel read ahead
+        if os.path.getsize(filepath) >= CHECKSUM_MMAP_THRESHOLD:
+            with open(filepath, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(mapped), CHECKSUM_CHUNK_SIZE):
+                        sha256_hash.update(view[offset:offset + CHECKSUM_CHUNK_SIZE])
+                finally:
+                    view.release()
+            return sha256_hash.hexdigest()
+
+        # Stream the file through one reusable buffer: memory stays bounded by
+        # the chunk size and no new bytes object is allocated per chunk
+        buffer = bytearray(CHECKSUM_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(filepath, 'rb', buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                sha256_hash.update(view[:n])
 
         return sha256_hash.hexdigest()
 
 
+    def _compute_file_checksums(self, filepaths):
+        """
+        Compute SHA256 checksums of several files concurrently.
+
+        hashlib releases the GIL while hashing large buffers, so reading and
+        hashing different files overlaps across threads.
+
+        Args:
+            filepaths: Paths to files
+
+        Returns:
+            Dict mapping each path to its checksum (None if it doesn't exist)
+        """
+        filepaths = list(dict.fromkeys(filepaths))
+        if len(filepaths) <= 1:
+            return {path: self._compute_file_checksum(path) for path in filepaths}
+
+        with ThreadPoolExecutor(max_workers=min(CHECKSUM_MAX_WORKERS, len(filepaths))) as executor:
+            return dict(zip(filepaths, executor.map(self._compute_file_checksum, filepaths)))
+
+
+    def _file_fingerprint(self, filepath):
+        """
+        Get a stat-based fingerprint of a file, used to skip rehashing it.
+
+        Args:
+            filepath: Path to file
+
+        Returns:
+            Tuple of (size, mtime_ns), or None if the file doesn't exist or was
+            modified too recently for its mtime to be trusted
+        """
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+
+        if time.time_ns() - st.st_mtime_ns < FINGERPRINT_MIN_AGE_NS:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+
+    def _recorded_checksum(self, table_name, years, filepath, fingerprint):
+        """
+        Reuse the stored checksum of a file that is unchanged on disk.
+
+        Args:
+            table_name: Table name
+            years: Years loaded from the file
+            filepath: Path to source file
+            fingerprint: Current (size, mtime_ns) of the file, from _file_fingerprint
+
+        Returns:
+            Stored checksum if every year was recorded from this path with the
+            same fingerprint and checksum, otherwise None
+        """
+        if fingerprint is None:
+            return None
+
+        years = sorted(set(years))
+        placeholders = ','.join('?' * len(years))
+        rows = self.conn.execute(f"""
+            SELECT file_path, file_checksum, file_size, file_mtime_ns
+            FROM _maude_load_metadata
+            WHERE table_name = ? AND year IN ({placeholders})
+        """, (table_name, *years)).fetchall()
+
+        if len(rows) != len(years):
+            return None
+
+        checksums = {row[1] for row in rows}
+        if len(checksums) != 1:
+            return None
+        if any(row[0] != filepath or (row[2], row[3]) != fingerprint for row in rows):
+            return None
+        return checksums.pop()
+
+
     def _get_loaded_file_info(self, table_name, year):
         """
         Get metadata about a previously loaded file.
@@ -162,7 +299,8 @@ class MaudeDatabase:
         return None
 
 
-    def _record_file_load(self, table_name, year, filepath, file_checksum, row_count):
+    def _record_file_load(self, table_name, year, filepath, file_checksum, row_count,
+                          fingerprint=None):
         """
         Record that a file has been loaded into the database.
 
@@ -172,12 +310,41 @@ class MaudeDatabase:
             filepath: Path to source file
             file_checksum: SHA256 checksum of file
             row_count: Number of rows loaded
+            fingerprint: Optional (size, mtime_ns) of the file when it was hashed
         """
-        self.conn.execute("""
-            INSERT OR REPLACE INTO _maude_load_metadata
-            (table_name, year, file_path, file_checksum, loaded_at, row_count)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (table_name, year, filepath, file_checksum, datetime.now().isoformat(), row_count))
+        self._record_file_loads(table_name, [year], filepath, file_checksum, row_count, fingerprint)
+
+
+    def _record_file_loads(self, table_name, years, filepath, file_checksum, row_count,
+                           fingerprint=None):
+        """
+        Record that a file has been loaded for several years, in one transaction.
+
+        Args:
+            table_name: Table name
+            years: Years loaded from the file
+            filepath: Path to source file
+            file_checksum: SHA256 checksum of file
+            row_count: Number of rows loaded
+            fingerprint: Optional (size, mtime_ns) of the file when it was hashed
+        """
+        file_size, file_mtime_ns = fingerprint or (None, None)
+        loaded_at = datetime.now().isoformat()
+        # Upsert rather than INSERT OR REPLACE, which deletes and reinserts the row
+        self.conn.executemany("""
+            INSERT INTO _maude_load_metadata
+            (table_name, year, file_path, file_checksum, loaded_at, row_count,
+             file_size, file_mtime_ns)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (table_name, year) DO UPDATE SET
+                file_path = excluded.file_path,
+                file_checksum = excluded.file_checksum,
+                loaded_at = excluded.loaded_at,
+                row_count = excluded.row_count,
+                file_size = excluded.file_size,
+                file_mtime_ns = excluded.file_mtime_ns
+        """, [(table_name, year, filepath, file_checksum, loaded_at, row_count,
+               file_size, file_mtime_ns) for year in years])
         self.conn.commit()
 
 
@@ -191,6 +358,17 @@ class MaudeDatabase:
             table_name: Table name
             year: Year to delete
         """
+        self._delete_years_data(table_name, [year])
+
+
+    def _delete_years_data(self, table_name, years):
+        """
+        Delete all data for several years from a table, in one transaction.
+
+        Args:
+            table_name: Table name
+            years: Years to delete
+        """
         # Check if table exists first
         cursor = self.conn.execute(
             "SELECT name FROM sqlite_master WHERE type='table' AND name=?",
@@ -199,19 +377,25 @@ class MaudeDatabase:
         if not cursor.fetchone():
             return  # Table doesn't exist, nothing to delete
 
+        self._known_tables.clear()
+
         metadata = self.TABLE_METADATA.get(table_name, {})
         date_column = metadata.get('date_column')
 
         if not date_column:
             if self.verbose:
-                print(f'  Warning: Cannot delete year {year} from {table_name} - no date column defined')
+                for year in years:
+                    print(f'  Warning: Cannot delete year {year} from {table_name} - no date column defined')
             return
 
-        # Delete rows for this year
-        self.conn.execute(f"""
+        # Delete rows for each year. Dates are stored as ISO text, so the range
+        # narrows the DELETE to one year through the date index (where there
+        # is one) instead of evaluating strftime on every row
+        self.conn.executemany(f"""
             DELETE FROM {table_name}
-            WHERE strftime('%Y', {date_column}) = ?
-        """, (str(year),))
+            WHERE {date_column} >= ? AND {date_column} < ?
+              AND strftime('%Y', {date_column}) = ?
+        """, [(f'{year:04d}-01-01', f'{year + 1:04d}-01-01', str(year)) for year in years])
         self.conn.commit()
 
 
@@ -233,7 +417,7 @@ class MaudeDatabase:
         if not cursor.fetchone():
             return 0
 
-        cursor = self.conn.execute(f"SELECT COUNT(*) FROM {table_name}")
+        cursor = self.conn.execute(f'SELECT COUNT(*) FROM "{table_name}"')
         return cursor.fetchone()[0]
 
 
@@ -313,6 +497,7 @@ class MaudeDatabase:
 
         # Track which tables were actually loaded
         loaded_tables = set()
+        self._known_tables.clear()
         current_year = datetime.now().year
 
         # OPTIMIZATION: Group years by file for batch processing
@@ -352,9 +537,29 @@ class MaudeDatabase:
         if self.verbose:
             print(f'\nProcessing data files...')
 
+        # CHECKSUM TRACKING: Resolve each file's checksum before loading anything.
+        # A file with the same path, size and mtime as when it was recorded
+        # reuses the stored checksum instead of being read again, unless a
+        # refresh was forced; the remaining files are hashed concurrently.
+        # Paths are re-checked in case download changed them.
+        files_in_dir = self._list_data_dir(data_dir)
+        file_states = {}
+        for (table, filepath, pattern_type), years_for_file in file_groups.items():
+            path = self._make_file_path(table, years_for_file[0], data_dir, files_in_dir)
+            if not path:
+                continue
+            fingerprint = self._file_fingerprint(path)
+            recorded_checksum = (None if force_refresh else
+                                 self._recorded_checksum(table, years_for_file, path, fingerprint))
+            file_states[(table, filepath, pattern_type)] = (path, fingerprint, recorded_checksum)
+
+        computed_checksums = self._compute_file_checksums(
+            path for path, _, recorded_checksum in file_states.values() if not recorded_checksum
+        )
+
         for (table, filepath, pattern_type), years_for_file in file_groups.items():
-            # Re-check file path in case download changed it
-            path = self._make_file_path(table, years_for_file[0], data_dir)
+            path, fingerprint, recorded_checksum = file_states.get(
+                (table, filepath, pattern_type), (None, None, None))
 
             if not path:
                 if strict:
@@ -364,7 +569,7 @@ class MaudeDatabase:
                 continue
 
             # CHECKSUM TRACKING: Check if we need to process this file
-            current_checksum = self._compute_file_checksum(path)
+            current_checksum = recorded_checksum or computed_checksums.get(path)
             if not current_checksum:
                 if self.verbose:
                     print(f'  Warning: Could not compute checksum for {path}')
@@ -421,10 +626,10 @@ class MaudeDatabase:
 
             # Delete old data for years that need refresh
             if years_needing_refresh:
-                for year in years_needing_refresh:
-                    if self.verbose:
+                if self.verbose:
+                    for year in years_needing_refresh:
                         print(f'  Deleting old data for {table} year {year}...')
-                    self._delete_year_data(table, year)
+                self._delete_years_data(table, years_needing_refresh)
 
             # Get metadata for this table
             metadata = self.TABLE_METADATA.get(table, {})
@@ -446,7 +651,7 @@ class MaudeDatabase:
             else:
                 # Yearly files: process each year separately
                 for year in years_for_file:
-                    year_path = self._make_file_path(table, year, data_dir)
+                    year_path = self._make_file_path(table, year, data_dir, files_in_dir)
                     if year_path:
                         if self.verbose and len(years_for_file) > 1:
                             print(f'  Processing year {year}...')
@@ -456,8 +661,8 @@ class MaudeDatabase:
             rows_after = self._count_table_rows(table)
             rows_loaded = rows_after - rows_before
 
-            for year in years_for_file:
-                self._record_file_load(table, year, path, current_checksum, rows_loaded)
+            self._record_file_loads(table, years_for_file, path, current_checksum, rows_loaded,
+                                    fingerprint)
 
             loaded_tables.add(table)
 
@@ -535,7 +740,7 @@ class MaudeDatabase:
                   e.g., {('master', './maude_data/mdrfoithru2024.txt'): [1996, 1997, ..., 2024]}
         """
         file_groups = defaultdict(list)
-        current_year = datetime.now().year
+        files_in_dir = self._list_data_dir(data_dir)
 
         for table in tables:
             if table not in self.TABLE_METADATA:
@@ -546,7 +751,7 @@ class MaudeDatabase:
 
             for year in years_list:
                 # First try to find existing file
-                file_path = self._make_file_path(table, year, data_dir)
+                file_path = self._make_file_path(table, year, data_dir, files_in_dir)
 
                 # If no existing file, predict what the path will be after download
                 if not file_path:
@@ -821,7 +1026,22 @@ class MaudeDatabase:
         return True, valid
 
 
-    def _make_file_path(self, table, year, data_dir='./maude_data'):
+    def _list_data_dir(self, data_dir):
+        """
+        List the files in the data directory once, for repeated path lookups.
+
+        Args:
+            data_dir: Directory containing data files
+
+        Returns:
+            List of file names, empty if the directory doesn't exist
+        """
+        if not os.path.exists(data_dir):
+            return []
+        return os.listdir(data_dir)
+
+
+    def _make_file_path(self, table, year, data_dir='./maude_data', files_in_dir=None):
         """
         Create a path for the MAUDE datafile, checking all possible naming patterns.
 
@@ -829,6 +1049,8 @@ class MaudeDatabase:
             table: Table name (e.g., 'master', 'device')
             year: Year as integer
             data_dir: Directory containing data files
+            files_in_dir: Optional listing of data_dir from _list_data_dir, so
+                          callers resolving many table/year pairs list it once
 
         Returns:
             path if it exists
@@ -842,11 +1064,11 @@ class MaudeDatabase:
         pattern_type = metadata['pattern_type']
         current_year = datetime.now().year
 
-        if not os.path.exists(data_dir):
+        if files_in_dir is None:
+            files_in_dir = self._list_data_dir(data_dir)
+        if not files_in_dir:
             return False
 
-        files_in_dir = os.listdir(data_dir)
-
         # Patterns to check (both lowercase and uppercase)
         patterns = []
 
@@ -1384,35 +1606,36 @@ class MaudeDatabase:
         return trends
 
 
-    def get_narratives(self, mdr_report_keys):
+    def get_narratives(self, mdr_report_keys, arrow_strings=False):
         """
         Get text narratives for specific report keys.
 
         Args:
             mdr_report_keys: List of MDR report keys
+            arrow_strings: If True, return FOI_TEXT as Arrow-backed strings
+                          (requires pyarrow; default: False)
 
         Returns:
             DataFrame with mdr_report_key and narrative text
+
+        Raises:
+            ValueError: If text table not loaded
         """
         if not mdr_report_keys:
             return pd.DataFrame(columns=['MDR_REPORT_KEY', 'FOI_TEXT'])
 
-        # Batch queries to avoid SQLite variable limit (typically 999)
-        batch_size = 900
-        result_dfs = []
+        analysis_helpers._require_table(self, 'text')
 
-        for i in range(0, len(mdr_report_keys), batch_size):
-            batch_keys = mdr_report_keys[i:i + batch_size]
-            placeholders = ','.join('?' * len(batch_keys))
-            sql = f"""
-                SELECT MDR_REPORT_KEY, FOI_TEXT
-                FROM text
-                WHERE MDR_REPORT_KEY IN ({placeholders})
-            """
-            batch_df = pd.read_sql_query(sql, self.conn, params=batch_keys)
-            result_dfs.append(batch_df)
+        # Batch the IN (...) lookups to stay under SQLite's variable limit;
+        # each batch is served by the MDR_REPORT_KEY index. Read-only: no
+        # temp tables or commits that would touch the caller's transaction
+        narratives = analysis_helpers._batched_query_by_keys(
+            self, 'text', 'MDR_REPORT_KEY, FOI_TEXT', mdr_report_keys
+        )
 
-        return pd.concat(result_dfs, ignore_index=True) if result_dfs else pd.DataFrame(columns=['MDR_REPORT_KEY', 'FOI_TEXT'])
+        if arrow_strings:
+            analysis_helpers._to_arrow_strings(narratives, ['FOI_TEXT'])
+        return narratives
 
 
     def export_subset(self, output_file, **filters):
@@ -1462,9 +1685,9 @@ class MaudeDatabase:
         """Join patient outcome data. See analysis_helpers module."""
         return analysis_helpers.enrich_with_patient_data(self, results_df)
 
-    def enrich_with_narratives(self, results_df):
+    def enrich_with_narratives(self, results_df, arrow_strings=False):
         """Join event narratives. See analysis_helpers module."""
-        return analysis_helpers.enrich_with_narratives(self, results_df)
+        return analysis_helpers.enrich_with_narratives(self, results_df, arrow_strings)
 
     def summarize_by_brand(self, results_df, group_column='search_group', include_temporal=True):
         """Generate summary statistics by brand or search group. See analysis_helpers module."""
@@ -1742,6 +1965,30 @@ class MaudeDatabase:
                 deduplicate_events, use_concat_column, group_column
             )
 
+        sql, params = self._device_search_query(
+            criteria, start_date, end_date,
+            deduplicate_events, use_concat_column
+        )
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def _device_search_query(self, criteria, start_date=None, end_date=None,
+                             deduplicate_events=True, use_concat_column=True,
+                             param_prefix=''):
+        """
+        Build the SQL and named parameters for a non-grouped device name search.
+
+        Args:
+            criteria: String, list of strings, or list of lists (see search_by_device_names)
+            start_date: Optional start date filter
+            end_date: Optional end date filter
+            deduplicate_events: Whether to deduplicate by EVENT_KEY
+            use_concat_column: Whether to use DEVICE_NAME_CONCAT column
+            param_prefix: Prefix for parameter names, so several searches can
+                          be combined into one statement
+
+        Returns:
+            Tuple of (sql, params)
+        """
         # Normalize criteria to list of lists format
         if isinstance(criteria, str):
             # Single string -> [['term']]
@@ -1797,7 +2044,7 @@ class MaudeDatabase:
             for term in group:
                 # Escape special SQL LIKE characters
                 term_escaped = term.replace('%', '\\%').replace('_', '\\_')
-                param_name = f'term_{param_counter}'
+                param_name = f'{param_prefix}term_{param_counter}'
                 param_counter += 1
 
                 if use_concat_column:
@@ -1825,12 +2072,12 @@ class MaudeDatabase:
         # Build date filter conditions
         date_conditions = []
         if start_date:
-            date_conditions.append("m.DATE_RECEIVED >= :start")
-            params['start'] = start_date
+            date_conditions.append(f"m.DATE_RECEIVED >= :{param_prefix}start")
+            params[f'{param_prefix}start'] = start_date
 
         if end_date:
-            date_conditions.append("m.DATE_RECEIVED < date(:end, '+1 day')")
-            params['end'] = end_date
+            date_conditions.append(f"m.DATE_RECEIVED < date(:{param_prefix}end, '+1 day')")
+            params[f'{param_prefix}end'] = end_date
 
         date_where = " AND ".join(date_conditions) if date_conditions else "1=1"
 
@@ -1897,7 +2144,7 @@ class MaudeDatabase:
                 WHERE {date_where}
             """
 
-        return pd.read_sql_query(sql, self.conn, params=params)
+        return sql, params
 
     def _search_by_device_names_grouped(self, criteria_dict, start_date=None, end_date=None,
                                        deduplicate_events=True, use_concat_column=True,
@@ -1920,6 +2167,7 @@ class MaudeDatabase:
             - Events only appear in first matching group (dict order)
             - Warnings issued when events match multiple groups
             - Empty groups are omitted from returned DataFrame
+            - All groups are fetched with a single UNION ALL query
         """
         import warnings
 
@@ -1931,62 +2179,53 @@ class MaudeDatabase:
             if not isinstance(key, str):
                 raise ValueError(f"All group names must be strings, got {type(key).__name__}")
 
-        # Track seen MDR_REPORT_KEYs to handle overlaps
-        seen_keys = set()
-        group_dataframes = []
-
-        # Process each group in dict order
-        for group_name, group_criteria in criteria_dict.items():
-            # Search for this group
-            group_results = self.search_by_device_names(
+        # Run every group's search as one UNION ALL statement, tagging rows
+        # with the group's position instead of issuing a query per group
+        subqueries = []
+        params = {}
+        for group_idx, group_criteria in enumerate(criteria_dict.values()):
+            sql, group_params = self._device_search_query(
                 group_criteria,
                 start_date=start_date,
                 end_date=end_date,
                 deduplicate_events=deduplicate_events,
-                use_concat_column=use_concat_column
+                use_concat_column=use_concat_column,
+                param_prefix=f'g{group_idx}_'
+            )
+            subqueries.append(f"SELECT *, {group_idx} AS _group_index FROM ({sql})")
+            params.update(group_params)
+
+        # SQLite caps the number of terms in a compound SELECT at 500
+        results = pd.concat([
+            pd.read_sql_query(" UNION ALL ".join(subqueries[i:i + 500]), self.conn, params=params)
+            for i in range(0, len(subqueries), 500)
+        ], ignore_index=True)
+
+        # Events belong to the first group (dict order) that matched them
+        first_group = results.groupby('MDR_REPORT_KEY', sort=False)['_group_index'].transform('min')
+        overlap = (results['_group_index'] > first_group).to_numpy()
+
+        group_names = list(criteria_dict.keys())
+        overlap_counts = results.loc[overlap].groupby('_group_index')['MDR_REPORT_KEY'].nunique()
+        for group_idx, n_overlap in overlap_counts.items():
+            # Issue warning about overlaps
+            warnings.warn(
+                f"{n_overlap} events previously matched to other groups "
+                f"were skipped from '{group_names[group_idx]}'",
+                UserWarning
             )
 
-            # Skip if no results
-            if len(group_results) == 0:
-                continue
-
-            # Check for overlaps with previously seen events
-            group_keys = set(group_results['MDR_REPORT_KEY'])
-            overlap_keys = group_keys & seen_keys
-
-            if overlap_keys:
-                # Issue warning about overlaps
-                warnings.warn(
-                    f"{len(overlap_keys)} events previously matched to other groups "
-                    f"were skipped from '{group_name}'",
-                    UserWarning
-                )
-
-                # Filter out overlapping events
-                group_results = group_results[~group_results['MDR_REPORT_KEY'].isin(overlap_keys)]
-
-            # Skip if all events were filtered out
-            if len(group_results) == 0:
-                continue
-
-            # Add group column
-            group_results[group_column] = group_name
-
-            # Track keys for this group
-            seen_keys.update(set(group_results['MDR_REPORT_KEY']))
-
-            # Add to results list
-            group_dataframes.append(group_results)
+        results = results.loc[~overlap].reset_index(drop=True)
 
-        # Concatenate all results
-        if len(group_dataframes) == 0:
+        if len(results) == 0:
             # No results at all - return empty DataFrame with expected columns
             empty_df = pd.DataFrame()
             empty_df[group_column] = []
             return empty_df
 
-        combined_results = pd.concat(group_dataframes, ignore_index=True)
-        return combined_results
+        # Replace the position tag with the group name
+        results[group_column] = results.pop('_group_index').map(dict(enumerate(group_names)))
+        return results
 
     # ==================== Database Info Methods ====================
 
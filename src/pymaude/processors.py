@@ -104,6 +104,50 @@ def _truncate_large_text_columns(df, max_length=MAX_TEXT_LENGTH):
     return df_copy
 
 
+def _begin_bulk_load(conn):
+    """
+    Switch a connection to fast, non-durable PRAGMA settings for bulk loading.
+
+    Args:
+        conn: SQLite database connection
+
+    Returns:
+        Tuple of (synchronous, journal_mode, locking_mode) in effect before
+        the switch, to be passed to _end_bulk_load
+    """
+    previous = (conn.execute("PRAGMA synchronous").fetchone()[0],
+                conn.execute("PRAGMA journal_mode").fetchone()[0],
+                conn.execute("PRAGMA locking_mode").fetchone()[0])
+
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -64000")  # 64MB cache
+    # Keep the file lock between the loader's commits instead of releasing
+    # and reacquiring it for every chunk
+    conn.execute("PRAGMA locking_mode = EXCLUSIVE")
+    return previous
+
+
+def _end_bulk_load(conn, previous):
+    """
+    Commit and restore the PRAGMA settings saved by _begin_bulk_load.
+
+    Restoring rather than resetting to FULL/DELETE keeps a database opened
+    in WAL mode (MaudeDatabase(..., wal=True)) in WAL mode after a load.
+
+    Args:
+        conn: SQLite database connection
+        previous: Tuple returned by _begin_bulk_load
+    """
+    synchronous, journal_mode, locking_mode = previous
+    conn.commit()
+    conn.execute(f"PRAGMA locking_mode = {locking_mode}")
+    conn.execute(f"PRAGMA synchronous = {int(synchronous)}")
+    # Also touches the database, which releases an exclusive lock
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+
+
 def process_file(filepath, table_name, conn, chunk_size, verbose=False):
     """
     Read MAUDE text file and insert into SQLite database.
@@ -116,52 +160,48 @@ def process_file(filepath, table_name, conn, chunk_size, verbose=False):
         verbose: Whether to print progress messages
     """
     # Set PRAGMA optimizations for bulk loading
-    conn.execute("PRAGMA synchronous = OFF")
-    conn.execute("PRAGMA journal_mode = MEMORY")
-    conn.execute("PRAGMA temp_store = MEMORY")
-    conn.execute("PRAGMA cache_size = -64000")  # 64MB cache
+    previous_pragmas = _begin_bulk_load(conn)
+
+    try:
+        total_rows = 0
+        date_columns = None
+
+        for i, chunk in enumerate(pd.read_csv(
+            filepath,
+            sep='|',
+            encoding='latin1',
+            on_bad_lines='warn',  # Changed from 'skip' to 'warn' - still skips but warns
+            chunksize=chunk_size,
+            engine='python',  # Python engine is more lenient with malformed lines
+            quoting=3  # QUOTE_NONE - don't use special quoting
+        )):
+            # Identify date columns on first chunk
+            if i == 0:
+                date_columns = _identify_date_columns(chunk)
+                if verbose and date_columns:
+                    print(f'    Identified date columns: {", ".join(date_columns)}')
+
+            # Parse date columns with flexible format detection
+            if date_columns:
+                chunk = _parse_dates_flexible(chunk, date_columns)
 
-    total_rows = 0
-    date_columns = None
-
-    for i, chunk in enumerate(pd.read_csv(
-        filepath,
-        sep='|',
-        encoding='latin1',
-        on_bad_lines='warn',  # Changed from 'skip' to 'warn' - still skips but warns
-        chunksize=chunk_size,
-        engine='python',  # Python engine is more lenient with malformed lines
-        quoting=3  # QUOTE_NONE - don't use special quoting
-    )):
-        # Identify date columns on first chunk
-        if i == 0:
-            date_columns = _identify_date_columns(chunk)
-            if verbose and date_columns:
-                print(f'    Identified date columns: {", ".join(date_columns)}')
-
-        # Parse date columns with flexible format detection
-        if date_columns:
-            chunk = _parse_dates_flexible(chunk, date_columns)
-
-        # Convert key columns to integer for consistent join types
-        # MDR_REPORT_KEY and EVENT_KEY should always be integers for proper joins
-        if 'MDR_REPORT_KEY' in chunk.columns:
-            chunk['MDR_REPORT_KEY'] = pd.to_numeric(chunk['MDR_REPORT_KEY'], errors='coerce').astype('Int64')
-        if 'EVENT_KEY' in chunk.columns:
-            chunk['EVENT_KEY'] = pd.to_numeric(chunk['EVENT_KEY'], errors='coerce').astype('Int64')
-
-        # Truncate text columns that might exceed SQLite's max length
-        chunk = _truncate_large_text_columns(chunk)
-        chunk.to_sql(table_name, conn, if_exists='append', index=False)
-        total_rows += len(chunk)
-
-        if verbose and i % 10 == 0 and i > 0:
-            print(f'    Processed {total_rows:,} rows...')
-
-    # Restore default PRAGMA settings
-    conn.execute("PRAGMA synchronous = FULL")
-    conn.execute("PRAGMA journal_mode = DELETE")
-    conn.commit()
+            # Convert key columns to integer for consistent join types
+            # MDR_REPORT_KEY and EVENT_KEY should always be integers for proper joins
+            if 'MDR_REPORT_KEY' in chunk.columns:
+                chunk['MDR_REPORT_KEY'] = pd.to_numeric(chunk['MDR_REPORT_KEY'], errors='coerce').astype('Int64')
+            if 'EVENT_KEY' in chunk.columns:
+                chunk['EVENT_KEY'] = pd.to_numeric(chunk['EVENT_KEY'], errors='coerce').astype('Int64')
+
+            # Truncate text columns that might exceed SQLite's max length
+            chunk = _truncate_large_text_columns(chunk)
+            chunk.to_sql(table_name, conn, if_exists='append', index=False)
+            total_rows += len(chunk)
+
+            if verbose and i % 10 == 0 and i > 0:
+                print(f'    Processed {total_rows:,} rows...')
+    finally:
+        # Restore the connection's PRAGMA settings even if the load fails
+        _end_bulk_load(conn, previous_pragmas)
 
     if verbose:
         print(f'    Total: {total_rows:,} rows')
@@ -188,71 +228,67 @@ def process_cumulative_file(filepath, table_name, year, metadata, conn, chunk_si
         return process_file(filepath, table_name, conn, chunk_size, verbose)
 
     # Set PRAGMA optimizations for bulk loading
-    conn.execute("PRAGMA synchronous = OFF")
-    conn.execute("PRAGMA journal_mode = MEMORY")
-    conn.execute("PRAGMA temp_store = MEMORY")
-    conn.execute("PRAGMA cache_size = -64000")  # 64MB cache
-
-    total_rows = 0
-    filtered_rows = 0
-    date_columns = None
-
-    date_col = metadata['date_column']
-
-    if verbose:
-        print(f'    Processing cumulative file, filtering for year {year}...')
-
-    for i, chunk in enumerate(pd.read_csv(
-        filepath,
-        sep='|',
-        encoding='latin1',
-        on_bad_lines='warn',  # Changed from 'skip' to 'warn' - still skips but warns
-        chunksize=chunk_size,
-        engine='python',  # Python engine is more lenient with malformed lines
-        quoting=3  # QUOTE_NONE - don't use special quoting
-    )):
-        # Identify date columns on first chunk
-        if i == 0:
-            date_columns = _identify_date_columns(chunk)
-            if verbose and date_columns:
-                print(f'    Identified date columns: {", ".join(date_columns)}')
-
-        # Parse date columns with flexible format detection
-        if date_columns:
-            chunk = _parse_dates_flexible(chunk, date_columns)
-
-        total_rows += len(chunk)
-
-        # Filter to specified year
-        if date_col in chunk.columns:
-            # Extract year from date column (already parsed as datetime)
-            chunk['_year'] = chunk[date_col].dt.year
-            chunk_filtered = chunk[chunk['_year'] == year]
-            chunk_filtered = chunk_filtered.drop(columns=['_year'])
-        else:
-            if verbose and i == 0:
-                print(f'    Warning: Date column {date_col} not found, loading all data')
-            chunk_filtered = chunk
-
-        if len(chunk_filtered) > 0:
-            # Convert key columns to integer for consistent join types
-            if 'MDR_REPORT_KEY' in chunk_filtered.columns:
-                chunk_filtered['MDR_REPORT_KEY'] = pd.to_numeric(chunk_filtered['MDR_REPORT_KEY'], errors='coerce').astype('Int64')
-            if 'EVENT_KEY' in chunk_filtered.columns:
-                chunk_filtered['EVENT_KEY'] = pd.to_numeric(chunk_filtered['EVENT_KEY'], errors='coerce').astype('Int64')
-
-            # Truncate text columns that might exceed SQLite's max length
-            chunk_filtered = _truncate_large_text_columns(chunk_filtered)
-            chunk_filtered.to_sql(table_name, conn, if_exists='append', index=False)
-            filtered_rows += len(chunk_filtered)
-
-        if verbose and i % 10 == 0 and i > 0:
-            print(f'    Scanned {total_rows:,} rows, kept {filtered_rows:,}...')
-
-    # Restore default PRAGMA settings
-    conn.execute("PRAGMA synchronous = FULL")
-    conn.execute("PRAGMA journal_mode = DELETE")
-    conn.commit()
+    previous_pragmas = _begin_bulk_load(conn)
+
+    try:
+        total_rows = 0
+        filtered_rows = 0
+        date_columns = None
+
+        date_col = metadata['date_column']
+
+        if verbose:
+            print(f'    Processing cumulative file, filtering for year {year}...')
+
+        for i, chunk in enumerate(pd.read_csv(
+            filepath,
+            sep='|',
+            encoding='latin1',
+            on_bad_lines='warn',  # Changed from 'skip' to 'warn' - still skips but warns
+            chunksize=chunk_size,
+            engine='python',  # Python engine is more lenient with malformed lines
+            quoting=3  # QUOTE_NONE - don't use special quoting
+        )):
+            # Identify date columns on first chunk
+            if i == 0:
+                date_columns = _identify_date_columns(chunk)
+                if verbose and date_columns:
+                    print(f'    Identified date columns: {", ".join(date_columns)}')
+
+            # Parse date columns with flexible format detection
+            if date_columns:
+                chunk = _parse_dates_flexible(chunk, date_columns)
+
+            total_rows += len(chunk)
+
+            # Filter to specified year
+            if date_col in chunk.columns:
+                # Extract year from date column (already parsed as datetime)
+                chunk['_year'] = chunk[date_col].dt.year
+                chunk_filtered = chunk[chunk['_year'] == year]
+                chunk_filtered = chunk_filtered.drop(columns=['_year'])
+            else:
+                if verbose and i == 0:
+                    print(f'    Warning: Date column {date_col} not found, loading all data')
+                chunk_filtered = chunk
+
+            if len(chunk_filtered) > 0:
+                # Convert key columns to integer for consistent join types
+                if 'MDR_REPORT_KEY' in chunk_filtered.columns:
+                    chunk_filtered['MDR_REPORT_KEY'] = pd.to_numeric(chunk_filtered['MDR_REPORT_KEY'], errors='coerce').astype('Int64')
+                if 'EVENT_KEY' in chunk_filtered.columns:
+                    chunk_filtered['EVENT_KEY'] = pd.to_numeric(chunk_filtered['EVENT_KEY'], errors='coerce').astype('Int64')
+
+                # Truncate text columns that might exceed SQLite's max length
+                chunk_filtered = _truncate_large_text_columns(chunk_filtered)
+                chunk_filtered.to_sql(table_name, conn, if_exists='append', index=False)
+                filtered_rows += len(chunk_filtered)
+
+            if verbose and i % 10 == 0 and i > 0:
+                print(f'    Scanned {total_rows:,} rows, kept {filtered_rows:,}...')
+    finally:
+        # Restore the connection's PRAGMA settings even if the load fails
+        _end_bulk_load(conn, previous_pragmas)
 
     if verbose:
         print(f'    Total: Scanned {total_rows:,} rows, loaded {filtered_rows:,} rows for year {year}')
@@ -282,81 +318,77 @@ def process_cumulative_file_batch(filepath, table_name, years_list, metadata, co
         return process_file(filepath, table_name, conn, chunk_size, verbose)
 
     # Set PRAGMA optimizations for bulk loading
-    conn.execute("PRAGMA synchronous = OFF")
-    conn.execute("PRAGMA journal_mode = MEMORY")
-    conn.execute("PRAGMA temp_store = MEMORY")
-    conn.execute("PRAGMA cache_size = -64000")  # 64MB cache
-
-    total_rows = 0
-    year_counts = {year: 0 for year in years_list}
-    years_set = set(years_list)
-    date_columns = None
-
-    date_col = metadata['date_column']
-
-    if verbose:
-        year_range = f"{min(years_list)}-{max(years_list)}" if len(years_list) > 1 else str(years_list[0])
-        print(f'    Processing cumulative file for years {year_range} (batch mode)...')
-
-    for i, chunk in enumerate(pd.read_csv(
-        filepath,
-        sep='|',
-        encoding='latin1',
-        on_bad_lines='warn',  # Changed from 'skip' to 'warn' - still skips but warns
-        chunksize=chunk_size,
-        engine='python',  # Python engine is more lenient with malformed lines
-        quoting=3  # QUOTE_NONE - don't use special quoting
-    )):
-        # Identify date columns on first chunk
-        if i == 0:
-            date_columns = _identify_date_columns(chunk)
-            if verbose and date_columns:
-                print(f'    Identified date columns: {", ".join(date_columns)}')
-
-        # Parse date columns with flexible format detection
-        if date_columns:
-            chunk = _parse_dates_flexible(chunk, date_columns)
-
-        total_rows += len(chunk)
-
-        # Filter to ANY requested year
-        if date_col in chunk.columns:
-            # Extract year from date column (already parsed as datetime)
-            chunk['_year'] = chunk[date_col].dt.year
-
-            # Filter for any year in the requested set
-            chunk_filtered = chunk[chunk['_year'].isin(years_set)]
-
-            # Track per-year counts
-            for year in chunk_filtered['_year'].unique():
-                if year in year_counts:
-                    year_counts[year] += sum(chunk_filtered['_year'] == year)
-
-            chunk_filtered = chunk_filtered.drop(columns=['_year'])
-        else:
-            if verbose and i == 0:
-                print(f'    Warning: Date column {date_col} not found, loading all data')
-            chunk_filtered = chunk
-
-        if len(chunk_filtered) > 0:
-            # Convert key columns to integer for consistent join types
-            if 'MDR_REPORT_KEY' in chunk_filtered.columns:
-                chunk_filtered['MDR_REPORT_KEY'] = pd.to_numeric(chunk_filtered['MDR_REPORT_KEY'], errors='coerce').astype('Int64')
-            if 'EVENT_KEY' in chunk_filtered.columns:
-                chunk_filtered['EVENT_KEY'] = pd.to_numeric(chunk_filtered['EVENT_KEY'], errors='coerce').astype('Int64')
-
-            # Truncate text columns that might exceed SQLite's max length
-            chunk_filtered = _truncate_large_text_columns(chunk_filtered)
-            chunk_filtered.to_sql(table_name, conn, if_exists='append', index=False)
-
-        if verbose and i % 10 == 0 and i > 0:
-            total_kept = sum(year_counts.values())
-            print(f'    Scanned {total_rows:,} rows, kept {total_kept:,}...')
-
-    # Restore default PRAGMA settings
-    conn.execute("PRAGMA synchronous = FULL")
-    conn.execute("PRAGMA journal_mode = DELETE")
-    conn.commit()
+    previous_pragmas = _begin_bulk_load(conn)
+
+    try:
+        total_rows = 0
+        year_counts = {year: 0 for year in years_list}
+        years_set = set(years_list)
+        date_columns = None
+
+        date_col = metadata['date_column']
+
+        if verbose:
+            year_range = f"{min(years_list)}-{max(years_list)}" if len(years_list) > 1 else str(years_list[0])
+            print(f'    Processing cumulative file for years {year_range} (batch mode)...')
+
+        for i, chunk in enumerate(pd.read_csv(
+            filepath,
+            sep='|',
+            encoding='latin1',
+            on_bad_lines='warn',  # Changed from 'skip' to 'warn' - still skips but warns
+            chunksize=chunk_size,
+            engine='python',  # Python engine is more lenient with malformed lines
+            quoting=3  # QUOTE_NONE - don't use special quoting
+        )):
+            # Identify date columns on first chunk
+            if i == 0:
+                date_columns = _identify_date_columns(chunk)
+                if verbose and date_columns:
+                    print(f'    Identified date columns: {", ".join(date_columns)}')
+
+            # Parse date columns with flexible format detection
+            if date_columns:
+                chunk = _parse_dates_flexible(chunk, date_columns)
+
+            total_rows += len(chunk)
+
+            # Filter to ANY requested year
+            if date_col in chunk.columns:
+                # Extract year from date column (already parsed as datetime)
+                chunk['_year'] = chunk[date_col].dt.year
+
+                # Filter for any year in the requested set
+                chunk_filtered = chunk[chunk['_year'].isin(years_set)]
+
+                # Track per-year counts
+                for year in chunk_filtered['_year'].unique():
+                    if year in year_counts:
+                        year_counts[year] += sum(chunk_filtered['_year'] == year)
+
+                chunk_filtered = chunk_filtered.drop(columns=['_year'])
+            else:
+                if verbose and i == 0:
+                    print(f'    Warning: Date column {date_col} not found, loading all data')
+                chunk_filtered = chunk
+
+            if len(chunk_filtered) > 0:
+                # Convert key columns to integer for consistent join types
+                if 'MDR_REPORT_KEY' in chunk_filtered.columns:
+                    chunk_filtered['MDR_REPORT_KEY'] = pd.to_numeric(chunk_filtered['MDR_REPORT_KEY'], errors='coerce').astype('Int64')
+                if 'EVENT_KEY' in chunk_filtered.columns:
+                    chunk_filtered['EVENT_KEY'] = pd.to_numeric(chunk_filtered['EVENT_KEY'], errors='coerce').astype('Int64')
+
+                # Truncate text columns that might exceed SQLite's max length
+                chunk_filtered = _truncate_large_text_columns(chunk_filtered)
+                chunk_filtered.to_sql(table_name, conn, if_exists='append', index=False)
+
+            if verbose and i % 10 == 0 and i > 0:
+                total_kept = sum(year_counts.values())
+                print(f'    Scanned {total_rows:,} rows, kept {total_kept:,}...')
+    finally:
+        # Restore the connection's PRAGMA settings even if the load fails
+        _end_bulk_load(conn, previous_pragmas)
 
     if verbose:
         total_kept = sum(year_counts.values())
@@ -419,4 +451,7 @@ def create_indexes(conn, tables, verbose=False):
     if 'text' in tables and 'text' in existing_tables:
         conn.execute('CREATE INDEX IF NOT EXISTS idx_text_key ON text(MDR_REPORT_KEY)')
 
+    if 'problems' in tables and 'problems' in existing_tables:
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_problems_key ON problems(MDR_REPORT_KEY)')
+
     conn.commit()
\ No newline at end of file
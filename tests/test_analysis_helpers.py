@@ -2,9 +2,14 @@
 Tests for analysis_helpers module.
 
 Includes both unit tests with synthetic data and integration tests with real test database.
+Integration tests that only read the sample database belong in
+TestAnalysisHelpersIntegrationReadOnly (one shared copy per class); tests that
+create tables or indexes belong in TestAnalysisHelpersIntegration, which gives
+each test its own copy.
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 import os
 import tempfile
@@ -12,6 +17,9 @@ from pymaude import MaudeDatabase
 from pymaude import analysis_helpers
 
 
+VENOVO_MAPPING = {'venovo': 'Venovo', 'vici': 'Vici'}
+
+
 class TestAnalysisHelpers:
     """Unit tests with synthetic data."""
 
@@ -31,6 +39,35 @@ class TestAnalysisHelpers:
         assert trends.loc[trends['year'] == 2020, 'deaths'].values[0] == 1
         assert trends.loc[trends['year'] == 2021, 'deaths'].values[0] == 1
 
+    def test_trends_for_fda_codes_and_multi_type_events(self):
+        """Test trends_for counts FDA codes and multi-type event strings."""
+        df = pd.DataFrame({
+            'DATE_RECEIVED': ['2020-01-15', '2020-06-20', '2020-09-01', '2021-03-10'],
+            'EVENT_TYPE': ['D', 'Injury, Malfunction', None, 'M']
+        })
+
+        trends = analysis_helpers.trends_for(df)
+
+        assert list(trends.columns) == ['year', 'event_count', 'deaths', 'injuries', 'malfunctions']
+        row_2020 = trends[trends['year'] == 2020].iloc[0]
+        assert row_2020['event_count'] == 3
+        assert row_2020['deaths'] == 1
+        assert row_2020['injuries'] == 1
+        assert row_2020['malfunctions'] == 1
+        assert trends.loc[trends['year'] == 2021, 'malfunctions'].values[0] == 1
+
+    def test_trends_for_categorical_event_type(self):
+        """Test trends_for gives the same counts for categorical EVENT_TYPE."""
+        df = pd.DataFrame({
+            'DATE_RECEIVED': ['2020-01-15', '2020-06-20', '2020-09-01', '2021-03-10'],
+            'EVENT_TYPE': ['D', 'Injury, Malfunction', None, 'M']
+        })
+
+        expected = analysis_helpers.trends_for(df)
+        result = analysis_helpers.trends_for(df.astype({'EVENT_TYPE': 'category'}))
+
+        pd.testing.assert_frame_equal(result, expected)
+
     def test_trends_for_missing_columns(self):
         """Test trends_for with missing columns raises error."""
         df = pd.DataFrame({'DATE_RECEIVED': ['2020-01-15']})
@@ -96,9 +133,8 @@ class TestAnalysisHelpers:
         df = pd.DataFrame({
             'BRAND_NAME': ['VENOVO', 'Venovo Stent', 'vici device', 'Unknown Product', None]
         })
-        mapping = {'venovo': 'Venovo', 'vici': 'Vici'}
 
-        result = analysis_helpers.standardize_brand_names(df, mapping)
+        result = analysis_helpers.standardize_brand_names(df, VENOVO_MAPPING)
 
         assert 'standard_brand' in result.columns
         # Check non-null values
@@ -114,15 +150,29 @@ class TestAnalysisHelpers:
         df = pd.DataFrame({
             'custom_brand': ['VENOVO Product', 'VICI Device']
         })
-        mapping = {'venovo': 'Venovo', 'vici': 'Vici'}
 
         result = analysis_helpers.standardize_brand_names(
-            df, mapping, source_col='custom_brand', target_col='cleaned_brand'
+            df, VENOVO_MAPPING, source_col='custom_brand', target_col='cleaned_brand'
         )
 
         assert 'cleaned_brand' in result.columns
         assert result['cleaned_brand'].tolist() == ['Venovo', 'Vici']
 
+    def test_standardize_brand_names_falsy_target(self):
+        """Test a pattern mapped to '' or None yields that value, not the original name."""
+        df = pd.DataFrame({
+            'BRAND_NAME': ['Venovo X', 'Vici Y', 'Other', None]
+        })
+
+        result = analysis_helpers.standardize_brand_names(
+            df, {'venovo': '', 'vici': None, 'v': 'V'}
+        )
+
+        assert result['standard_brand'].iloc[0] == ''
+        assert pd.isna(result['standard_brand'].iloc[1])
+        assert result['standard_brand'].iloc[2] == 'Other'
+        assert pd.isna(result['standard_brand'].iloc[3])
+
     def test_combine_device_names_search_groups_preserve_groups(self):
         data = {
             'search_group': [
@@ -593,6 +643,8 @@ class TestAnalysisHelpers:
         assert result['BRAND_NAME'].iloc[0] == 'ClotTriever XL Original Name'
         # But standardized version should be in device_model
         assert result['device_model'].iloc[0] == 'Inari Medical ClotTriever XL'
+        # And the input frame should not gain the new columns
+        assert 'device_model' not in df.columns
 
     def test_hierarchical_brand_standardization_order_matters(self):
         """Test that more specific patterns should be listed first in mappings."""
@@ -615,6 +667,36 @@ class TestAnalysisHelpers:
         assert result.iloc[0]['device_model'] == 'Penumbra Lightning Bolt (unspecified)'
         assert result.iloc[1]['device_model'] == 'Penumbra Lightning Flash (unspecified)'
 
+    def test_match_first_pattern_falsy_target(self):
+        """Test a pattern mapped to a falsy name still counts as the first match."""
+        values = pd.Series(['clottriever xl', 'clottriever', 'other'])
+        mapping = {'xl': '', 'clottriever': 'ClotTriever'}
+
+        names, matched = analysis_helpers._match_first_pattern(values, mapping)
+
+        assert names.tolist() == ['', 'ClotTriever', None]
+        assert matched.tolist() == [True, True, False]
+
+    def test_hierarchical_brand_standardization_falsy_target(self):
+        """Test a specific pattern mapped to a falsy name falls through to the family level."""
+        df = pd.DataFrame({
+            'BRAND_NAME': ['ClotTriever XL', 'ClotTriever BOLD']
+        })
+
+        specific = {
+            'clottriever xl': '',
+            'clottriever bold': None,
+            'clottriever': 'Inari Medical ClotTriever',
+        }
+        family = {'clottriever': 'Inari Medical ClotTriever'}
+
+        result = analysis_helpers.hierarchical_brand_standardization(
+            df, specific_mapping=specific, family_mapping=family
+        )
+
+        assert result['device_model'].tolist() == ['Inari Medical ClotTriever (unspecified)'] * 2
+        assert result['device_family'].tolist() == ['Inari Medical ClotTriever'] * 2
+
     def test_summarize_by_brand(self):
         """Test brand summarization with search_group column (new default)."""
         df = pd.DataFrame({
@@ -888,6 +970,51 @@ class TestAnalysisHelpers:
 
         assert len(result) == 0
 
+    def test_enrich_with_narratives_keeps_text_dtype_by_default(self, db_with_data):
+        """Test FOI_TEXT keeps pandas' default text dtype unless Arrow is requested."""
+        text_data = pd.DataFrame({
+            'MDR_REPORT_KEY': [1, 2],
+            'FOI_TEXT': ['Long narrative', None]
+        })
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+        # What the default Series constructor gives for the same values
+        expected = pd.Series(['Long narrative', None], name='FOI_TEXT')
+
+        enriched = analysis_helpers.enrich_with_narratives(
+            db_with_data, pd.DataFrame({'MDR_REPORT_KEY': [1, 2]})
+        )
+        narratives = db_with_data.get_narratives([1, 2])
+
+        for result in (enriched, narratives):
+            foi_text = result.sort_values('MDR_REPORT_KEY')['FOI_TEXT'].reset_index(drop=True)
+            assert not isinstance(foi_text.dtype, getattr(pd, 'ArrowDtype', ()))
+            assert foi_text.iloc[1] is not pd.NA
+            pd.testing.assert_series_equal(foi_text, expected)
+
+    def test_arrow_strings_requires_pyarrow(self, db_with_data, monkeypatch):
+        """Test opting in to Arrow strings without pyarrow raises ImportError."""
+        text_data = pd.DataFrame({'MDR_REPORT_KEY': [1], 'FOI_TEXT': ['Narrative']})
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+        monkeypatch.setattr(analysis_helpers, '_pyarrow_available', lambda: False)
+
+        with pytest.raises(ImportError, match='pyarrow'):
+            db_with_data.get_narratives([1], arrow_strings=True)
+        with pytest.raises(ImportError, match='pyarrow'):
+            analysis_helpers.enrich_with_narratives(
+                db_with_data, pd.DataFrame({'MDR_REPORT_KEY': [1]}), arrow_strings=True
+            )
+
+    def test_arrow_strings_uses_pyarrow_dtype(self, db_with_data):
+        """Test narratives are Arrow-backed when Arrow strings are requested."""
+        pytest.importorskip('pyarrow')
+        text_data = pd.DataFrame({'MDR_REPORT_KEY': [1, 2], 'FOI_TEXT': ['a', None]})
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+
+        narratives = db_with_data.get_narratives([1, 2], arrow_strings=True)
+
+        assert narratives['FOI_TEXT'].dtype == 'string[pyarrow]'
+        assert set(narratives['FOI_TEXT'].dropna()) == {'a'}
+
     # ==================== summarize_devices tests ====================
 
     def test_summarize_devices_basic(self):
@@ -954,108 +1081,149 @@ class TestAnalysisHelpers:
         assert result['BRAND_NAME'].iloc[0] == 'Apple'
         assert result['BRAND_NAME'].iloc[2] == 'Zebra'
 
+    def test_summarize_devices_single_column_matches_general_path(self):
+        """Test single-column fast path matches drop_duplicates + sort."""
+        df = pd.DataFrame({
+            'BRAND_NAME': ['Zebra', None, 'Apple', 'Zebra', None, 'Middle']
+        })
 
-@pytest.mark.integration
-class TestAnalysisHelpersIntegration:
-    """Integration tests with real test database."""
-
-    @pytest.fixture
-    def db_with_data(self, tmp_path):
-        """Create test database with sample data."""
-        db_path = str(tmp_path / 'test.db')
-        db = MaudeDatabase(db_path, verbose=False)
+        result = analysis_helpers.summarize_devices(df, columns=['BRAND_NAME'])
+        expected = (df[['BRAND_NAME']].drop_duplicates()
+                    .sort_values('BRAND_NAME', na_position='last')
+                    .reset_index(drop=True))
 
-        # Create sample device data
-        device_data = pd.DataFrame({
-            'MDR_REPORT_KEY': [1, 2, 3, 4, 5],
-            'BRAND_NAME': ['Test Device A', 'Test Device B', 'Test Device A', 'Test Device C', 'Test Device B'],
-            'GENERIC_NAME': ['Device Type 1', 'Device Type 2', 'Device Type 1', 'Device Type 3', 'Device Type 2'],
-            'MANUFACTURER_D_NAME': ['Acme Corp', 'Beta Inc', 'Acme Corp', 'Gamma LLC', 'Beta Inc'],
-            'DEVICE_REPORT_PRODUCT_CODE': ['ABC', 'DEF', 'ABC', 'GHI', 'DEF'],
-            'DATE_RECEIVED': ['2020-01-15', '2020-06-20', '2021-03-10', '2021-08-05', '2021-12-25'],
-            'EVENT_TYPE': ['Death', 'Injury', 'Malfunction', 'Death', 'Injury']
-        })
+        pd.testing.assert_frame_equal(result, expected)
 
-        # Insert into database
-        device_data.to_sql('device', db.conn, if_exists='replace', index=False)
 
-        # Create master table entry with EVENT_KEY column
-        master_data = pd.DataFrame({
-            'MDR_REPORT_KEY': [1, 2, 3, 4, 5],
-            'EVENT_KEY': ['EVT1', 'EVT2', 'EVT3', 'EVT4', 'EVT5'],
-            'DATE_RECEIVED': ['2020-01-15', '2020-06-20', '2021-03-10', '2021-08-05', '2021-12-25'],
-            'EVENT_TYPE': ['Death', 'Injury', 'Malfunction', 'Death', 'Injury']
-        })
-        master_data.to_sql('master', db.conn, if_exists='replace', index=False)
+def _insert_rows(conn, table, frame):
+    """Create a table and bulk insert a DataFrame's rows in one transaction."""
+    columns = ', '.join(frame.columns)
+    placeholders = ', '.join('?' * len(frame.columns))
+    with conn:
+        conn.execute(f'CREATE TABLE {table} ({columns})')
+        conn.executemany(f'INSERT INTO {table} VALUES ({placeholders})',
+                         frame.itertuples(index=False, name=None))
+
+
+@pytest.fixture(scope='session')
+def template_db():
+    """Build the sample database once, in memory; tests get their own copy of it."""
+    db = MaudeDatabase(':memory:', verbose=False)
+
+    # Create sample device data
+    device_data = pd.DataFrame({
+        'MDR_REPORT_KEY': [1, 2, 3, 4, 5],
+        'BRAND_NAME': ['Test Device A', 'Test Device B', 'Test Device A', 'Test Device C', 'Test Device B'],
+        'GENERIC_NAME': ['Device Type 1', 'Device Type 2', 'Device Type 1', 'Device Type 3', 'Device Type 2'],
+        'MANUFACTURER_D_NAME': ['Acme Corp', 'Beta Inc', 'Acme Corp', 'Gamma LLC', 'Beta Inc'],
+        'DEVICE_REPORT_PRODUCT_CODE': ['ABC', 'DEF', 'ABC', 'GHI', 'DEF'],
+        'DATE_RECEIVED': ['2020-01-15', '2020-06-20', '2021-03-10', '2021-08-05', '2021-12-25'],
+        'EVENT_TYPE': ['Death', 'Injury', 'Malfunction', 'Death', 'Injury']
+    })
+
+    # Insert into database
+    _insert_rows(db.conn, 'device', device_data)
+
+    # Create master table entry with EVENT_KEY column
+    master_data = pd.DataFrame({
+        'MDR_REPORT_KEY': [1, 2, 3, 4, 5],
+        'EVENT_KEY': ['EVT1', 'EVT2', 'EVT3', 'EVT4', 'EVT5'],
+        'DATE_RECEIVED': ['2020-01-15', '2020-06-20', '2021-03-10', '2021-08-05', '2021-12-25'],
+        'EVENT_TYPE': ['Death', 'Injury', 'Malfunction', 'Death', 'Injury']
+    })
+    _insert_rows(db.conn, 'master', master_data)
+
+    yield db
+    db.close()
+
+
+def _copy_db(template_db):
+    """Restore the sample database into a fresh in-memory MaudeDatabase."""
+    db = MaudeDatabase(':memory:', verbose=False)
+    template_db.conn.backup(db.conn)
+    return db
+
+
+@pytest.fixture(scope='class')
+def shared_db(template_db):
+    """Sample database shared by every test in a class; tests must not write to it."""
+    db = _copy_db(template_db)
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def db_with_data(template_db):
+    """Create test database with sample data."""
+    # Private in-memory copy, so tests that add tables stay isolated
+    db = _copy_db(template_db)
+    yield db
+    db.close()
 
-        yield db
-        db.close()
 
-    def test_enrich_missing_table_raises_error(self, db_with_data):
+@pytest.mark.integration
+class TestAnalysisHelpersIntegrationReadOnly:
+    """Integration tests that only read the sample database (shared per class)."""
+
+    @pytest.mark.parametrize('enrich, message', [
+        (analysis_helpers.enrich_with_problems, "Problems table not loaded"),
+        (analysis_helpers.enrich_with_patient_data, "Patient table not loaded"),
+        (analysis_helpers.enrich_with_narratives, "Text table not loaded"),
+    ])
+    def test_enrich_missing_table_raises_error(self, shared_db, enrich, message):
         """Test strict error when table not loaded."""
         df = pd.DataFrame({'MDR_REPORT_KEY': [1, 2, 3]})
 
-        with pytest.raises(ValueError, match="Problems table not loaded"):
-            analysis_helpers.enrich_with_problems(db_with_data, df)
-
-        with pytest.raises(ValueError, match="Patient table not loaded"):
-            analysis_helpers.enrich_with_patient_data(db_with_data, df)
+        with pytest.raises(ValueError, match=message):
+            enrich(shared_db, df)
 
+    def test_get_narratives_missing_table_raises_error(self, shared_db):
+        """Test get_narratives reports a missing text table without writing DDL."""
         with pytest.raises(ValueError, match="Text table not loaded"):
-            analysis_helpers.enrich_with_narratives(db_with_data, df)
+            shared_db.get_narratives([1, 2])
 
-    def test_get_narratives_for_wrapper(self, db_with_data):
-        """Test get_narratives_for with database instance."""
-        # Create text table
-        text_data = pd.DataFrame({
-            'MDR_REPORT_KEY': [1, 2],
-            'FOI_TEXT': ['Event narrative 1', 'Event narrative 2']
-        })
-        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+        indexes = shared_db.conn.execute(
+            "SELECT name FROM sqlite_master WHERE name='idx_text_key'"
+        ).fetchall()
+        assert indexes == []
 
-        results = pd.DataFrame({'MDR_REPORT_KEY': [1, 2, 3]})
-        narratives = analysis_helpers.get_narratives_for(db_with_data, results)
-
-        assert len(narratives) == 2  # Only 2 have narratives
-        assert 'FOI_TEXT' in narratives.columns
-
-    def test_backwards_compatibility_via_db_instance(self, db_with_data):
+    def test_backwards_compatibility_via_db_instance(self, shared_db):
         """Test that query methods work through database instance."""
         # Use exact-match query with new API
-        results = db_with_data.query_device(brand_name='Test Device A')
+        results = shared_db.query_device(brand_name='Test Device A')
 
         # Test old helper methods
-        trends = db_with_data.trends_for(results)
+        trends = shared_db.trends_for(results)
         assert len(trends) > 0
 
-        breakdown = db_with_data.event_type_breakdown_for(results)
+        breakdown = shared_db.event_type_breakdown_for(results)
         assert 'total' in breakdown
 
-        top_mfg = db_with_data.top_manufacturers_for(results)
+        top_mfg = shared_db.top_manufacturers_for(results)
         assert len(top_mfg) > 0
 
-        date_summary = db_with_data.date_range_summary_for(results)
+        date_summary = shared_db.date_range_summary_for(results)
         assert 'first_date' in date_summary
 
-    def test_new_methods_via_db_instance(self, db_with_data):
+    def test_new_methods_via_db_instance(self, shared_db):
         """Test that helper methods work through database instance."""
         # Use search_by_device_names instead of old query_device with device_name
-        results = db_with_data.search_by_device_names('Test Device A')
+        results = shared_db.search_by_device_names('Test Device A')
         assert len(results) > 0
 
         # Test standardize_brand_names
         mapping = {'test device a': 'Device A', 'test device b': 'Device B'}
-        standardized = db_with_data.standardize_brand_names(results, mapping)
+        standardized = shared_db.standardize_brand_names(results, mapping)
         assert 'standard_brand' in standardized.columns
 
         # Test summarize_by_brand with custom group_column
-        summary = db_with_data.summarize_by_brand(standardized, group_column='standard_brand')
+        summary = shared_db.summarize_by_brand(standardized, group_column='standard_brand')
         assert 'counts' in summary
 
-    def test_hierarchical_brand_standardization_via_db_instance(self, db_with_data):
+    def test_hierarchical_brand_standardization_via_db_instance(self, shared_db):
         """Test hierarchical standardization through database instance."""
         # Use search_by_device_names instead of old query_device with device_name
-        results = db_with_data.search_by_device_names('Test Device')
+        results = shared_db.search_by_device_names('Test Device')
 
         specific = {
             'test device a': 'Test Device A (Specific)',
@@ -1067,7 +1235,7 @@ class TestAnalysisHelpersIntegration:
             'test device': 'Test Manufacturer',
         }
 
-        result = db_with_data.hierarchical_brand_standardization(
+        result = shared_db.hierarchical_brand_standardization(
             results,
             specific_mapping=specific,
             family_mapping=family,
@@ -1079,17 +1247,51 @@ class TestAnalysisHelpersIntegration:
         assert 'manufacturer' in result.columns
         assert len(result) == len(results)  # Should preserve all rows
 
+
+@pytest.mark.integration
+class TestAnalysisHelpersIntegration:
+    """Integration tests that add tables or indexes (fresh database per test)."""
+
+    def test_get_narratives_for_wrapper(self, db_with_data):
+        """Test get_narratives_for with database instance."""
+        # Create text table
+        text_data = pd.DataFrame({
+            'MDR_REPORT_KEY': [1, 2],
+            'FOI_TEXT': ['Event narrative 1', 'Event narrative 2']
+        })
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+
+        results = pd.DataFrame({'MDR_REPORT_KEY': [1, 2, 3]})
+        narratives = analysis_helpers.get_narratives_for(db_with_data, results)
+
+        assert len(narratives) == 2  # Only 2 have narratives
+        assert 'FOI_TEXT' in narratives.columns
+
+    def test_get_narratives_for_duplicate_keys(self, db_with_data):
+        """Test that repeated report keys are only looked up once."""
+        text_data = pd.DataFrame({
+            'MDR_REPORT_KEY': [1, 2],
+            'FOI_TEXT': ['Event narrative 1', 'Event narrative 2']
+        })
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+
+        results = pd.DataFrame({'MDR_REPORT_KEY': [1, 1, 2, 2, None]})
+        narratives = analysis_helpers.get_narratives_for(db_with_data, results)
+
+        assert len(narratives) == 2
+        assert set(narratives['MDR_REPORT_KEY']) == {1, 2}
+
     def test_enrich_with_patient_data_handles_many_keys(self, db_with_data):
         """Verify enrichment works with key count that could exceed SQLite limit."""
         # Create patient table with 25 records (enough to test batching with small batch size)
         patient_data = pd.DataFrame({
-            'MDR_REPORT_KEY': list(range(1, 26)),
+            'MDR_REPORT_KEY': np.arange(1, 26),
             'SEQUENCE_NUMBER_OUTCOME': ['D'] * 10 + ['IN'] * 10 + ['H'] * 5
         })
         patient_data.to_sql('patient', db_with_data.conn, if_exists='replace', index=False)
 
         # Create input DataFrame with 25 keys
-        results_df = pd.DataFrame({'MDR_REPORT_KEY': list(range(1, 26))})
+        results_df = pd.DataFrame({'MDR_REPORT_KEY': np.arange(1, 26)})
 
         # This should work without hitting SQLite limit (uses batching internally)
         enriched = analysis_helpers.enrich_with_patient_data(db_with_data, results_df)
@@ -1097,6 +1299,61 @@ class TestAnalysisHelpersIntegration:
         assert len(enriched) == 25
         assert 'SEQUENCE_NUMBER_OUTCOME' in enriched.columns
 
+    def test_enrich_with_patient_data_null_outcome(self, db_with_data):
+        """Verify a null SEQUENCE_NUMBER_OUTCOME parses to no outcome codes."""
+        patient_data = pd.DataFrame({
+            'MDR_REPORT_KEY': [1, 2, 3],
+            'SEQUENCE_NUMBER_OUTCOME': ['IN;H', None, 'D']
+        })
+        patient_data.to_sql('patient', db_with_data.conn, if_exists='replace', index=False)
+
+        results_df = pd.DataFrame({'MDR_REPORT_KEY': [1, 2, 3]})
+        enriched = analysis_helpers.enrich_with_patient_data(db_with_data, results_df)
+
+        codes = dict(zip(enriched['MDR_REPORT_KEY'], enriched['outcome_codes']))
+        assert codes[1] == ['IN', 'H']
+        assert codes[2] == []
+        assert codes[3] == ['D']
+        assert not isinstance(enriched['SEQUENCE_NUMBER_OUTCOME'].dtype, pd.CategoricalDtype)
+
+    def test_known_tables_cleared_on_delete(self, db_with_data):
+        """Verify deleting table data forgets which tables were seen to exist."""
+        text_data = pd.DataFrame({
+            'MDR_REPORT_KEY': [1, 2],
+            'FOI_TEXT': ['Event narrative 1', 'Event narrative 2']
+        })
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+
+        results_df = pd.DataFrame({'MDR_REPORT_KEY': [1, 2]})
+        analysis_helpers.enrich_with_narratives(db_with_data, results_df)
+        assert 'text' in db_with_data._known_tables
+
+        db_with_data._delete_years_data('master', [2020])
+        assert db_with_data._known_tables == set()
+
+        db_with_data.conn.execute('DROP TABLE text')
+        with pytest.raises(ValueError, match="Text table not loaded"):
+            analysis_helpers.enrich_with_narratives(db_with_data, results_df)
+
+    def test_table_dropped_outside_add_years_raises_friendly_error(self, db_with_data):
+        """Verify a cached table dropped through db.conn is reported as not loaded."""
+        text_data = pd.DataFrame({
+            'MDR_REPORT_KEY': [1, 2],
+            'FOI_TEXT': ['Event narrative 1', 'Event narrative 2']
+        })
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+        results_df = pd.DataFrame({'MDR_REPORT_KEY': [1, 2]})
+        analysis_helpers.enrich_with_narratives(db_with_data, results_df)
+        assert 'text' in db_with_data._known_tables
+
+        db_with_data.conn.execute('DROP TABLE text')
+
+        with pytest.raises(ValueError, match="Text table not loaded"):
+            analysis_helpers.enrich_with_narratives(db_with_data, results_df)
+        assert 'text' not in db_with_data._known_tables
+        with pytest.raises(ValueError, match="Text table not loaded"):
+            db_with_data.get_narratives([1, 2])
+
     def test_enrich_with_patient_data_empty_input(self, db_with_data):
         """Verify enrichment handles empty DataFrame gracefully."""
         patient_data = pd.DataFrame({
@@ -1114,13 +1371,13 @@ class TestAnalysisHelpersIntegration:
         """Verify narrative enrichment works with many keys."""
         # Create text table with 25 records
         text_data = pd.DataFrame({
-            'MDR_REPORT_KEY': list(range(1, 26)),
+            'MDR_REPORT_KEY': np.arange(1, 26),
             'FOI_TEXT': [f'Narrative text {i}' for i in range(1, 26)]
         })
         text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
 
         # Create input DataFrame with 25 keys
-        results_df = pd.DataFrame({'MDR_REPORT_KEY': list(range(1, 26))})
+        results_df = pd.DataFrame({'MDR_REPORT_KEY': np.arange(1, 26)})
 
         # This should work without hitting SQLite limit
         enriched = analysis_helpers.enrich_with_narratives(db_with_data, results_df)
@@ -1132,14 +1389,14 @@ class TestAnalysisHelpersIntegration:
         """Verify problems enrichment works with many keys."""
         # Create problems table with 25 records
         problems_data = pd.DataFrame({
-            'MDR_REPORT_KEY': list(range(1, 26)),
+            'MDR_REPORT_KEY': np.arange(1, 26),
             'DEVICE_SEQUENCE_NUMBER': [1] * 25,
             'DEVICE_PROBLEM_CODE': ['1234'] * 25
         })
         problems_data.to_sql('problems', db_with_data.conn, if_exists='replace', index=False)
 
         # Create input DataFrame with 25 keys
-        results_df = pd.DataFrame({'MDR_REPORT_KEY': list(range(1, 26))})
+        results_df = pd.DataFrame({'MDR_REPORT_KEY': np.arange(1, 26)})
 
         # This should work without hitting SQLite limit
         enriched = analysis_helpers.enrich_with_problems(db_with_data, results_df)
@@ -1151,7 +1408,7 @@ class TestAnalysisHelpersIntegration:
         """Verify get_narratives works with many keys."""
         # Create text table with 25 records
         text_data = pd.DataFrame({
-            'MDR_REPORT_KEY': list(range(1, 26)),
+            'MDR_REPORT_KEY': np.arange(1, 26),
             'FOI_TEXT': [f'Narrative text {i}' for i in range(1, 26)]
         })
         text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
@@ -1162,6 +1419,38 @@ class TestAnalysisHelpersIntegration:
         assert len(narratives) == 25
         assert 'FOI_TEXT' in narratives.columns
 
+    def test_get_narratives_more_keys_than_sqlite_variables(self, db_with_data):
+        """Verify get_narratives handles key lists past the SQLite variable limit."""
+        text_data = pd.DataFrame({
+            'MDR_REPORT_KEY': np.arange(1, 26),
+            'FOI_TEXT': [f'Narrative text {i}' for i in range(1, 26)]
+        })
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+
+        narratives = db_with_data.get_narratives(list(range(1, 2001)))
+
+        assert sorted(narratives['MDR_REPORT_KEY'].tolist()) == list(range(1, 26))
+
+    def test_get_narratives_leaves_caller_transaction_open(self, db_with_data):
+        """Verify get_narratives neither commits the caller's work nor leaves temp tables."""
+        text_data = pd.DataFrame({'MDR_REPORT_KEY': [1], 'FOI_TEXT': ['Narrative text 1']})
+        text_data.to_sql('text', db_with_data.conn, if_exists='replace', index=False)
+
+        db_with_data.conn.execute("INSERT INTO text VALUES (2, 'Uncommitted')")
+        assert db_with_data.conn.in_transaction
+
+        narratives = db_with_data.get_narratives(list(range(1, 2001)))
+
+        assert sorted(narratives['MDR_REPORT_KEY'].tolist()) == [1, 2]
+        assert db_with_data.conn.in_transaction
+        db_with_data.conn.rollback()
+        assert db_with_data.conn.execute('SELECT COUNT(*) FROM text').fetchone()[0] == 1
+        temp_tables = db_with_data.conn.execute(
+            "SELECT name FROM sqlite_temp_master WHERE type='table'"
+        ).fetchall()
+        assert temp_tables == []
+        assert 'FOI_TEXT' in narratives.columns
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
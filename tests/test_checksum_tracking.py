@@ -3,7 +3,9 @@ import os
 import tempfile
 import shutil
 import sqlite3
+import hashlib
 from datetime import datetime
+from unittest.mock import patch
 
 from pymaude import MaudeDatabase
 
@@ -15,6 +17,10 @@ class TestChecksumTracking(unittest.TestCase):
         """Set up test fixtures before each test"""
         # Create temporary directory for test data
         self.test_dir = tempfile.mkdtemp()
+        # Registered before anything else can fail, so it runs even if setUp
+        # does not finish; ignore_errors keeps a still-open database handle
+        # (Windows) from turning a passing test into an error
+        self.addCleanup(shutil.rmtree, self.test_dir, ignore_errors=True)
         self.test_db = os.path.join(self.test_dir, 'test_maude.db')
         self.test_data_dir = os.path.join(self.test_dir, 'maude_data')
         os.makedirs(self.test_data_dir)
@@ -22,10 +28,6 @@ class TestChecksumTracking(unittest.TestCase):
         # Create sample test data files
         self._create_test_files()
 
-    def tearDown(self):
-        """Clean up after each test"""
-        shutil.rmtree(self.test_dir)
-
     def _create_test_files(self):
         """Create sample MAUDE data files for testing"""
         # Sample master file (cumulative pattern)
@@ -74,7 +76,9 @@ class TestChecksumTracking(unittest.TestCase):
             'file_path': 'TEXT',
             'file_checksum': 'TEXT',
             'loaded_at': 'TIMESTAMP',
-            'row_count': 'INTEGER'
+            'row_count': 'INTEGER',
+            'file_size': 'INTEGER',
+            'file_mtime_ns': 'INTEGER'
         }
 
         for col_name, col_type in expected_columns.items():
@@ -155,6 +159,36 @@ class TestChecksumTracking(unittest.TestCase):
         self.assertNotEqual(checksum1, checksum2)
         db.close()
 
+    def test_compute_checksum_mmap_path_matches_sha256(self):
+        """Test that the mmap path for large files gives the plain SHA256 digest"""
+        db = MaudeDatabase(self.test_db, verbose=False)
+
+        with open(self.master_file, 'rb') as f:
+            expected = hashlib.sha256(f.read()).hexdigest()
+
+        with patch('pymaude.database.CHECKSUM_MMAP_THRESHOLD', 1), \
+                patch('pymaude.database.CHECKSUM_CHUNK_SIZE', 16):
+            checksum = db._compute_file_checksum(self.master_file)
+
+        self.assertEqual(checksum, expected)
+        db.close()
+
+    def test_compute_checksums_matches_single_file_checksums(self):
+        """Test that concurrent hashing gives the same checksum per file"""
+        db = MaudeDatabase(self.test_db, verbose=False)
+        missing = os.path.join(self.test_data_dir, 'missing.txt')
+
+        checksums = db._compute_file_checksums(
+            [self.master_file, self.text_file, missing, self.master_file]
+        )
+
+        self.assertEqual(checksums, {
+            self.master_file: db._compute_file_checksum(self.master_file),
+            self.text_file: db._compute_file_checksum(self.text_file),
+            missing: None,
+        })
+        db.close()
+
     # ========== File Load Recording Tests ==========
 
     def test_record_file_load(self):
@@ -229,18 +263,39 @@ class TestChecksumTracking(unittest.TestCase):
                     data_dir=self.test_data_dir, interactive=False)
 
         # Verify data exists
-        count_before = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_before = db._count_table_rows('master')
         self.assertEqual(count_before, 2)
 
         # Delete year data
         db._delete_year_data('master', 2020)
 
         # Verify data deleted
-        count_after = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_after = db._count_table_rows('master')
         self.assertEqual(count_after, 0)
 
         db.close()
 
+    def test_delete_years_data_removes_only_given_years(self):
+        """Test deleting several years at once leaves other years in place"""
+        db = MaudeDatabase(self.test_db, verbose=False)
+
+        db.conn.execute("CREATE TABLE master (MDR_REPORT_KEY TEXT, DATE_RECEIVED TIMESTAMP)")
+        db.conn.executemany("INSERT INTO master VALUES (?, ?)", [
+            ('1', '2018-12-31 00:00:00'),
+            ('2', '2019-01-01 00:00:00'),
+            ('3', '2020-06-15 00:00:00'),
+            ('4', '2021-01-01 00:00:00'),
+        ])
+        db.conn.commit()
+
+        db._delete_years_data('master', [2019, 2020])
+
+        remaining = [row[0] for row in db.conn.execute(
+            "SELECT MDR_REPORT_KEY FROM master ORDER BY MDR_REPORT_KEY")]
+        self.assertEqual(remaining, ['1', '4'])
+
+        db.close()
+
     def test_delete_year_data_nonexistent_table(self):
         """Test deleting from non-existent table doesn't error"""
         db = MaudeDatabase(self.test_db, verbose=False)
@@ -310,7 +365,7 @@ class TestChecksumTracking(unittest.TestCase):
                     data_dir=self.test_data_dir, interactive=False)
 
         # Verify data was loaded
-        count = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count = db._count_table_rows('master')
         self.assertEqual(count, 2)
 
         # Verify metadata was recorded
@@ -327,18 +382,107 @@ class TestChecksumTracking(unittest.TestCase):
         db.add_years(2020, tables=['master'], download=False,
                     data_dir=self.test_data_dir, interactive=False)
 
-        count_after_first = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_after_first = db._count_table_rows('master')
         self.assertEqual(count_after_first, 2)
 
         # Second load - should skip
         db.add_years(2020, tables=['master'], download=False,
                     data_dir=self.test_data_dir, interactive=False)
 
-        count_after_second = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_after_second = db._count_table_rows('master')
         self.assertEqual(count_after_second, 2)  # No duplicates!
 
         db.close()
 
+    def _age_file(self, path, seconds=60):
+        """Backdate a file's mtime so its stat fingerprint is trusted"""
+        past = os.stat(path).st_mtime - seconds
+        os.utime(path, (past, past))
+
+    def test_add_years_unchanged_file_reuses_recorded_checksum(self):
+        """Test that an unchanged file (same size and mtime) is not rehashed"""
+        self._age_file(self.master_file)
+        db = MaudeDatabase(self.test_db, verbose=False)
+
+        db.add_years(2020, tables=['master'], download=False,
+                    data_dir=self.test_data_dir, interactive=False)
+        first_checksum = db._get_loaded_file_info('master', 2020)['file_checksum']
+
+        with patch.object(MaudeDatabase, '_compute_file_checksum') as compute:
+            db.add_years(2020, tables=['master'], download=False,
+                        data_dir=self.test_data_dir, interactive=False)
+            compute.assert_not_called()
+
+        self.assertEqual(db._get_loaded_file_info('master', 2020)['file_checksum'], first_checksum)
+        count = db._count_table_rows('master')
+        self.assertEqual(count, 2)
+
+        db.close()
+
+    def test_add_years_touched_file_is_rehashed(self):
+        """Test that a changed mtime falls back to hashing the file"""
+        self._age_file(self.master_file, seconds=120)
+        db = MaudeDatabase(self.test_db, verbose=False)
+
+        db.add_years(2020, tables=['master'], download=False,
+                    data_dir=self.test_data_dir, interactive=False)
+
+        self._age_file(self.master_file)
+        with patch.object(MaudeDatabase, '_compute_file_checksum',
+                          wraps=db._compute_file_checksum) as compute:
+            db.add_years(2020, tables=['master'], download=False,
+                        data_dir=self.test_data_dir, interactive=False)
+            compute.assert_called_once()
+
+        count = db._count_table_rows('master')
+        self.assertEqual(count, 2)  # Same content, so nothing reloaded
+
+        db.close()
+
+    def test_add_years_force_refresh_rehashes_unchanged_file(self):
+        """Test that force_refresh does not trust the stat fingerprint"""
+        self._age_file(self.master_file)
+        db = MaudeDatabase(self.test_db, verbose=False)
+
+        db.add_years(2020, tables=['master'], download=False,
+                    data_dir=self.test_data_dir, interactive=False)
+
+        with patch.object(MaudeDatabase, '_compute_file_checksum',
+                          wraps=db._compute_file_checksum) as compute:
+            db.add_years(2020, tables=['master'], download=False,
+                        data_dir=self.test_data_dir, interactive=False,
+                        force_refresh=True)
+            compute.assert_called_once()
+
+        db.close()
+
+    def test_metadata_table_migrates_legacy_schema(self):
+        """Test that fingerprint columns are added to an existing metadata table"""
+        conn = sqlite3.connect(self.test_db)
+        conn.execute("""
+            CREATE TABLE _maude_load_metadata (
+                table_name TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                file_path TEXT NOT NULL,
+                file_checksum TEXT NOT NULL,
+                loaded_at TIMESTAMP NOT NULL,
+                row_count INTEGER,
+                PRIMARY KEY (table_name, year)
+            )
+        """)
+        conn.execute("INSERT INTO _maude_load_metadata VALUES ('master', 2020, 'f', 'abc', '2020-01-01', 2)")
+        conn.commit()
+        conn.close()
+
+        db = MaudeDatabase(self.test_db, verbose=False)
+        cursor = db.conn.execute('PRAGMA table_info(_maude_load_metadata)')
+        columns = {row[1] for row in cursor.fetchall()}
+        self.assertIn('file_size', columns)
+        self.assertIn('file_mtime_ns', columns)
+        self.assertEqual(db._get_loaded_file_info('master', 2020)['file_checksum'], 'abc')
+
+        db.close()
+
     def test_add_years_changed_file_reprocesses(self):
         """Test that changed file is detected and reprocessed"""
         db = MaudeDatabase(self.test_db, verbose=False)
@@ -347,7 +491,7 @@ class TestChecksumTracking(unittest.TestCase):
         db.add_years(2020, tables=['master'], download=False,
                     data_dir=self.test_data_dir, interactive=False)
 
-        count_after_first = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_after_first = db._count_table_rows('master')
         self.assertEqual(count_after_first, 2)
 
         # Modify the file
@@ -358,7 +502,7 @@ class TestChecksumTracking(unittest.TestCase):
         db.add_years(2020, tables=['master'], download=False,
                     data_dir=self.test_data_dir, interactive=False)
 
-        count_after_second = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_after_second = db._count_table_rows('master')
         self.assertEqual(count_after_second, 3)  # Updated data
 
         db.close()
@@ -371,7 +515,7 @@ class TestChecksumTracking(unittest.TestCase):
         db.add_years(2020, tables=['master'], download=False,
                     data_dir=self.test_data_dir, interactive=False)
 
-        count_after_first = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_after_first = db._count_table_rows('master')
         self.assertEqual(count_after_first, 2)
 
         # Second load with force_refresh - should process even though unchanged
@@ -379,7 +523,7 @@ class TestChecksumTracking(unittest.TestCase):
                     data_dir=self.test_data_dir, interactive=False,
                     force_refresh=True)
 
-        count_after_second = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_after_second = db._count_table_rows('master')
         self.assertEqual(count_after_second, 2)  # Replaced, not duplicated
 
         db.close()
@@ -412,13 +556,13 @@ class TestChecksumTracking(unittest.TestCase):
         db.add_years([2019, 2020], tables=['master'], download=False,
                     data_dir=self.test_data_dir, interactive=False)
 
-        count_first = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_first = db._count_table_rows('master')
 
         # Second load - should skip both years
         db.add_years([2019, 2020], tables=['master'], download=False,
                     data_dir=self.test_data_dir, interactive=False)
 
-        count_second = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_second = db._count_table_rows('master')
         self.assertEqual(count_first, count_second)  # No duplicates
 
         db.close()
@@ -433,7 +577,7 @@ class TestChecksumTracking(unittest.TestCase):
         db.add_years(2020, tables=['master'], download=False,
                     data_dir=self.test_data_dir, interactive=False)
 
-        count_first = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_first = db._count_table_rows('master')
         self.assertEqual(count_first, 2)
 
         # Now load 2019-2020 (2020 already exists with same checksum)
@@ -442,7 +586,7 @@ class TestChecksumTracking(unittest.TestCase):
                     data_dir=self.test_data_dir, interactive=False)
 
         # Should not have duplicates - data should be unchanged
-        count_second = db.query("SELECT COUNT(*) as count FROM master")['count'][0]
+        count_second = db._count_table_rows('master')
         self.assertEqual(count_second, 2)  # No duplicates
 
         db.close()
@@ -95,6 +95,13 @@ class TestEventKeyFunctions(unittest.TestCase):
         self.assertEqual(evt003.iloc[0]['report_count'], 3)
         self.assertEqual(len(evt003.iloc[0]['mdr_report_keys']), 3)
 
+    def test_detect_multi_report_events_lists_reports_per_event(self):
+        """Test that report keys are collected per event and null keys are ignored."""
+        multi_reports = analysis_helpers.detect_multi_report_events(self.test_data_with_nulls)
+
+        self.assertEqual(multi_reports['EVENT_KEY'].tolist(), ['EVT003'])
+        self.assertEqual(multi_reports.iloc[0]['mdr_report_keys'], ['4', '5'])
+
     def test_select_primary_report_first_received(self):
         """Test selecting earliest report for each event."""
         deduplicated = analysis_helpers.select_primary_report(
@@ -119,6 +126,20 @@ class TestEventKeyFunctions(unittest.TestCase):
 
         self.assertEqual(len(deduplicated), 3)
 
+    def test_select_primary_report_keeps_whole_report(self):
+        """Test that the selected report's fields are not filled from other reports."""
+        test_data = self.test_data.copy()
+        test_data.loc[0, 'MANUFACTURER_NAME'] = None  # Earliest EVT001 report
+        test_data.loc[1, 'MANUFACTURER_NAME'] = 'Other Mfg'
+
+        deduplicated = analysis_helpers.select_primary_report(
+            test_data, strategy='first_received'
+        )
+
+        evt001 = deduplicated[deduplicated['EVENT_KEY'] == 'EVT001'].iloc[0]
+        self.assertEqual(evt001['MDR_REPORT_KEY'], '1')
+        self.assertTrue(pd.isna(evt001['MANUFACTURER_NAME']))
+
     def test_compare_report_vs_event_counts(self):
         """Test report vs event comparison."""
         comparison = analysis_helpers.compare_report_vs_event_counts(self.test_data)
@@ -140,6 +161,18 @@ class TestEventKeyFunctions(unittest.TestCase):
         self.assertEqual(len(comparison), 1)  # Only 2020
         self.assertIn('year', comparison.columns)
 
+    def test_compare_report_vs_event_counts_grouped_with_nulls(self):
+        """Test that each null EVENT_KEY counts as its own event within a group."""
+        test_data = self.test_data_with_nulls.copy()
+        test_data['group'] = ['a', 'a', 'a', 'b', 'b', 'b']
+
+        comparison = analysis_helpers.compare_report_vs_event_counts(
+            test_data, group_by='group'
+        )
+
+        self.assertEqual(comparison['report_count'].tolist(), [3, 3])
+        self.assertEqual(comparison['event_count'].tolist(), [3, 2])
+
 
 if __name__ == '__main__':
     unittest.main()
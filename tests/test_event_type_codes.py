@@ -16,13 +16,19 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pymaude import MaudeDatabase
 
 
+@pytest.fixture(scope="module")
+def db():
+    """Shared in-memory database; the DataFrame helpers under test keep no state on it."""
+    database = MaudeDatabase(':memory:', verbose=False)
+    yield database
+    database.close()
+
+
 class TestEventTypeCodes:
     """Test suite for EVENT_TYPE abbreviation and combination handling."""
 
-    def test_fda_abbreviations(self):
+    def test_fda_abbreviations(self, db):
         """Test that FDA abbreviations (D, IN, M) are correctly identified."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3, 4, 5],
             'EVENT_TYPE': ['D', 'IN', 'M', 'O', '*'],
@@ -36,12 +42,8 @@ class TestEventTypeCodes:
         assert breakdown['injuries'] == 1, "Should find 'IN' as injury"
         assert breakdown['malfunctions'] == 1, "Should find 'M' as malfunction"
 
-        db.close()
-
-    def test_legacy_full_words(self):
+    def test_legacy_full_words(self, db):
         """Test backwards compatibility with full word event types."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3],
             'EVENT_TYPE': ['Death', 'Injury', 'Malfunction'],
@@ -54,12 +56,8 @@ class TestEventTypeCodes:
         assert breakdown['injuries'] == 1, "Should find 'Injury' (full word)"
         assert breakdown['malfunctions'] == 1, "Should find 'Malfunction' (full word)"
 
-        db.close()
-
-    def test_mixed_formats(self):
+    def test_mixed_formats(self, db):
         """Test mix of abbreviations and full words."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3, 4, 5, 6],
             'EVENT_TYPE': ['D', 'Death', 'IN', 'Injury', 'M', 'Malfunction'],
@@ -72,12 +70,8 @@ class TestEventTypeCodes:
         assert breakdown['injuries'] == 2, "Should find both 'IN' and 'Injury'"
         assert breakdown['malfunctions'] == 2, "Should find both 'M' and 'Malfunction'"
 
-        db.close()
-
-    def test_empty_and_null_event_types(self):
+    def test_empty_and_null_event_types(self, db):
         """Test handling of empty and null EVENT_TYPE values."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3],
             'EVENT_TYPE': ['', None, 'M'],
@@ -91,12 +85,8 @@ class TestEventTypeCodes:
         assert breakdown['injuries'] == 0
         assert breakdown['malfunctions'] == 1
 
-        db.close()
-
-    def test_case_insensitive_matching(self):
+    def test_case_insensitive_matching(self, db):
         """Test that matching is case-insensitive for full words."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3],
             'EVENT_TYPE': ['death', 'INJURY', 'MaLfUnCtIoN'],
@@ -109,12 +99,8 @@ class TestEventTypeCodes:
         assert breakdown['injuries'] == 1, "Should match 'INJURY' (uppercase)"
         assert breakdown['malfunctions'] == 1, "Should match 'MaLfUnCtIoN' (mixed case)"
 
-        db.close()
-
-    def test_word_boundary_matching(self):
+    def test_word_boundary_matching(self, db):
         """Test that abbreviations use word boundaries to avoid false matches."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         # 'M' should only match as a complete word, not within other words
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3],
@@ -127,12 +113,8 @@ class TestEventTypeCodes:
         # All three should be counted as malfunctions
         assert breakdown['malfunctions'] == 3
 
-        db.close()
-
-    def test_trends_for_with_abbreviations(self):
+    def test_trends_for_with_abbreviations(self, db):
         """Test trends_for() method with FDA abbreviations."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3, 4, 5, 6],
             'EVENT_TYPE': ['D', 'IN', 'M', 'D', 'IN', 'M'],
@@ -158,12 +140,8 @@ class TestEventTypeCodes:
         assert year_2021['injuries'] == 1
         assert year_2021['malfunctions'] == 1
 
-        db.close()
-
-    def test_duplicate_columns_handling(self):
+    def test_duplicate_columns_handling(self, db):
         """Test that duplicate EVENT_TYPE columns are handled correctly."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         # Simulate what happens when query_device() joins master and device tables
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3],
@@ -182,9 +160,7 @@ class TestEventTypeCodes:
         assert breakdown['injuries'] == 1
         assert breakdown['malfunctions'] == 1
 
-        db.close()
-
-    def test_all_known_event_types(self):
+    def test_all_known_event_types(self, db):
         """Test all documented FDA event type codes.
 
         Official FDA codes (from MDR Data Files documentation):
@@ -194,8 +170,6 @@ class TestEventTypeCodes:
         - O = Other
         - * = No answer provided
         """
-        db = MaudeDatabase(':memory:', verbose=False)
-
         # Based on actual FDA data: D, IN, M, O, *, and empty
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2, 3, 4, 5, 6],
@@ -212,17 +186,13 @@ class TestEventTypeCodes:
         # O (Other) and * (unknown) and empty should not be counted
         assert breakdown['deaths'] + breakdown['injuries'] + breakdown['malfunctions'] == 3
 
-        db.close()
-
-    def test_fda_combination_codes(self):
+    def test_fda_combination_codes(self, db):
         """Test FDA combination codes used in Alternative Summary Reports (ASRs).
 
         Official FDA combination codes:
         - M-D = Malfunction where a patient death was reported
         - IN-D = Serious Injury where a patient death was reported
         """
-        db = MaudeDatabase(':memory:', verbose=False)
-
         df = pd.DataFrame({
             'MDR_REPORT_KEY': [1, 2],
             'EVENT_TYPE': ['M-D', 'IN-D'],
@@ -238,8 +208,6 @@ class TestEventTypeCodes:
         # IN-D should be counted as both injury AND death
         assert breakdown['injuries'] >= 1, "IN-D should count as injury"
 
-        db.close()
-
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
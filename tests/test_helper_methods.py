@@ -18,11 +18,21 @@ from pymaude import MaudeDatabase
 from pymaude import analysis_helpers
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def db():
+    """One in-memory database for the module; the db.method() wrappers are stateless."""
+    database = MaudeDatabase(':memory:', verbose=False)
+    yield database
+    database.close()
+
+
+@pytest.fixture(scope="module")
 def sample_results_df():
     """Create a sample DataFrame that mimics query_device() output.
 
     Uses FDA abbreviations: D=Death, IN=Injury, M=Malfunction
+
+    Shared by every test in the module, so tests must not modify it.
     """
     return pd.DataFrame({
         'MDR_REPORT_KEY': [1001, 1002, 1003, 1004, 1005],
@@ -37,10 +47,8 @@ def sample_results_df():
 class TestHelperMethods:
     """Test suite for DataFrame helper methods."""
 
-    def test_event_type_breakdown_for(self, sample_results_df):
+    def test_event_type_breakdown_for(self, db, sample_results_df):
         """Test event type breakdown calculation."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         breakdown = db.event_type_breakdown_for(sample_results_df)
 
         assert breakdown['total'] == 5
@@ -49,22 +57,15 @@ class TestHelperMethods:
         assert breakdown['malfunctions'] >= 1  # At least 1 malfunction
         assert all(isinstance(v, int) for v in breakdown.values())
 
-        db.close()
-
-    def test_event_type_breakdown_missing_column(self):
+    def test_event_type_breakdown_missing_column(self, db):
         """Test that missing EVENT_TYPE column raises error."""
-        db = MaudeDatabase(':memory:', verbose=False)
         df = pd.DataFrame({'MDR_REPORT_KEY': [1, 2, 3]})
 
         with pytest.raises(ValueError, match="must contain 'EVENT_TYPE'"):
             db.event_type_breakdown_for(df)
 
-        db.close()
-
-    def test_trends_for(self, sample_results_df):
+    def test_trends_for(self, db, sample_results_df):
         """Test yearly trends calculation."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         trends = db.trends_for(sample_results_df)
 
         # Should have 3 years (2020, 2021, 2022)
@@ -80,22 +81,15 @@ class TestHelperMethods:
         assert len(year_2020) == 1
         assert year_2020.iloc[0]['event_count'] == 2
 
-        db.close()
-
-    def test_trends_for_missing_columns(self):
+    def test_trends_for_missing_columns(self, db):
         """Test that missing required columns raises error."""
-        db = MaudeDatabase(':memory:', verbose=False)
         df = pd.DataFrame({'MDR_REPORT_KEY': [1, 2, 3]})
 
         with pytest.raises(ValueError, match="missing required columns"):
             db.trends_for(df)
 
-        db.close()
-
-    def test_top_manufacturers_for(self, sample_results_df):
+    def test_top_manufacturers_for(self, db, sample_results_df):
         """Test top manufacturers extraction."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         top_mfg = db.top_manufacturers_for(sample_results_df, n=2)
 
         assert len(top_mfg) == 2
@@ -106,22 +100,15 @@ class TestHelperMethods:
         assert top_mfg.iloc[0]['manufacturer'] == 'Company A'
         assert top_mfg.iloc[0]['event_count'] == 3
 
-        db.close()
-
-    def test_top_manufacturers_for_missing_column(self):
+    def test_top_manufacturers_for_missing_column(self, db):
         """Test that missing MANUFACTURER_D_NAME column raises error."""
-        db = MaudeDatabase(':memory:', verbose=False)
         df = pd.DataFrame({'MDR_REPORT_KEY': [1, 2, 3]})
 
         with pytest.raises(ValueError, match="must contain 'MANUFACTURER_D_NAME'"):
             db.top_manufacturers_for(df)
 
-        db.close()
-
-    def test_date_range_summary_for(self, sample_results_df):
+    def test_date_range_summary_for(self, db, sample_results_df):
         """Test date range summary calculation."""
-        db = MaudeDatabase(':memory:', verbose=False)
-
         summary = db.date_range_summary_for(sample_results_df)
 
         assert 'first_date' in summary
@@ -134,28 +121,20 @@ class TestHelperMethods:
         assert summary['total_records'] == 5
         assert summary['total_days'] > 0
 
-        db.close()
-
-    def test_date_range_summary_missing_column(self):
+    def test_date_range_summary_missing_column(self, db):
         """Test that missing DATE_RECEIVED column raises error."""
-        db = MaudeDatabase(':memory:', verbose=False)
         df = pd.DataFrame({'MDR_REPORT_KEY': [1, 2, 3]})
 
         with pytest.raises(ValueError, match="must contain 'DATE_RECEIVED'"):
             db.date_range_summary_for(df)
 
-        db.close()
-
-    def test_get_narratives_for_missing_column(self):
+    def test_get_narratives_for_missing_column(self, db):
         """Test that missing MDR_REPORT_KEY column raises error."""
-        db = MaudeDatabase(':memory:', verbose=False)
         df = pd.DataFrame({'SOME_OTHER_COLUMN': [1, 2, 3]})
 
         with pytest.raises(ValueError, match="must contain 'MDR_REPORT_KEY'"):
             db.get_narratives_for(df)
 
-        db.close()
-
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
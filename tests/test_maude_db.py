@@ -20,16 +20,14 @@ class TestMaudeDatabase(unittest.TestCase):
         """Set up test fixtures before each test"""
         # Create temporary directory for test data
         self.test_dir = tempfile.mkdtemp()
+        # Removed even if setUp fails part-way or a connection is left open
+        self.addCleanup(shutil.rmtree, self.test_dir, ignore_errors=True)
         self.test_db = os.path.join(self.test_dir, 'test_maude.db')
         self.test_data_dir = os.path.join(self.test_dir, 'maude_data')
         os.makedirs(self.test_data_dir)
         
         # Create sample test data files
         self._create_test_files()
-        
-    def tearDown(self):
-        """Clean up after each test"""
-        shutil.rmtree(self.test_dir)
     
     def _create_test_files(self):
         """Create sample MAUDE data files for testing"""
@@ -112,6 +110,80 @@ class TestMaudeDatabase(unittest.TestCase):
         with self.assertRaises(sqlite3.ProgrammingError):
             db.conn.execute("SELECT 1")
     
+    def test_init_wal_mode_survives_add_years(self):
+        """Test that wal=True enables WAL and bulk loading keeps it"""
+        db = MaudeDatabase(self.test_db, verbose=False, wal=True)
+        self.assertEqual(db.conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+
+        db.add_years(2020, tables=['master', 'device'], download=False, data_dir=self.test_data_dir, interactive=False)
+
+        self.assertEqual(db.conn.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        self.assertEqual(db.conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        db.close()
+
+    def test_init_default_journal_mode_restored_after_add_years(self):
+        """Test that bulk loading restores the default rollback journal"""
+        db = MaudeDatabase(self.test_db, verbose=False)
+
+        db.add_years(2020, tables=['master'], download=False, data_dir=self.test_data_dir, interactive=False)
+
+        self.assertEqual(db.conn.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+        self.assertEqual(db.conn.execute("PRAGMA synchronous").fetchone()[0], 2)  # FULL
+        db.close()
+
+    def test_add_years_releases_exclusive_lock(self):
+        """Test that another connection can write once bulk loading finishes"""
+        for wal in (False, True):
+            with self.subTest(wal=wal):
+                db_path = os.path.join(self.test_dir, f'lock_{wal}.db')
+                db = MaudeDatabase(db_path, verbose=False, wal=wal)
+                db.add_years(2020, tables=['master'], download=False, data_dir=self.test_data_dir, interactive=False)
+
+                self.assertEqual(db.conn.execute("PRAGMA locking_mode").fetchone()[0], 'normal')
+                other = sqlite3.connect(db_path, timeout=0)
+                other.execute("CREATE TABLE other_writer (x INTEGER)")
+                other.commit()
+                other.close()
+                db.close()
+
+    def test_failed_load_restores_pragmas(self):
+        """Test that PRAGMA settings and the file lock are restored when a load raises"""
+        from pymaude import processors
+
+        master_path = os.path.join(self.test_data_dir, 'mdrfoithru2020.txt')
+        metadata = {'date_column': 'DATE_RECEIVED'}
+        loaders = {
+            'process_file': lambda conn: processors.process_file(
+                master_path, 'master', conn, 100),
+            'process_cumulative_file': lambda conn: processors.process_cumulative_file(
+                master_path, 'master', 2020, metadata, conn, 100),
+            'process_cumulative_file_batch': lambda conn: processors.process_cumulative_file_batch(
+                master_path, 'master', [2020], metadata, conn, 100),
+        }
+        for name, load in loaders.items():
+            with self.subTest(loader=name):
+                db_path = os.path.join(self.test_dir, f'failed_{name}.db')
+                db = MaudeDatabase(db_path, verbose=False)
+
+                with patch.object(pd.DataFrame, 'to_sql', side_effect=sqlite3.OperationalError('disk I/O error')):
+                    with self.assertRaises(sqlite3.OperationalError):
+                        load(db.conn)
+
+                self.assertEqual(db.conn.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+                self.assertEqual(db.conn.execute("PRAGMA synchronous").fetchone()[0], 2)  # FULL
+                self.assertEqual(db.conn.execute("PRAGMA locking_mode").fetchone()[0], 'normal')
+                other = sqlite3.connect(db_path, timeout=0)
+                other.execute("CREATE TABLE other_writer (x INTEGER)")
+                other.commit()
+                other.close()
+                db.close()
+
+    def test_init_new_database_page_size(self):
+        """Test that new databases are created with 8 KB pages"""
+        db = MaudeDatabase(self.test_db, verbose=False)
+        self.assertEqual(db.conn.execute("PRAGMA page_size").fetchone()[0], 8192)
+        db.close()
+    
     # ========== Year Parsing Tests ==========
     
     def test_parse_year_range_single_int(self):
@@ -183,6 +255,16 @@ class TestMaudeDatabase(unittest.TestCase):
         path = db._make_file_path('text', 1999, self.test_data_dir)
         self.assertFalse(path)
         db.close()
+
+    def test_group_years_by_file_lists_data_dir_once(self):
+        """Test that grouping many table/year pairs lists the data directory once"""
+        db = MaudeDatabase(self.test_db, verbose=False)
+        with patch('pymaude.database.os.listdir', wraps=os.listdir) as listdir:
+            groups = db._group_years_by_file([2018, 2019, 2020], ['master', 'device'], self.test_data_dir)
+        listdir.assert_called_once_with(self.test_data_dir)
+        self.assertEqual(groups[('master', f'{self.test_data_dir}/mdrfoithru2020.txt', 'cumulative')],
+                         [2018, 2019, 2020])
+        db.close()
     
     # ========== Add Years Tests ==========
     
@@ -314,6 +314,22 @@ class TestOverlapHandling:
             assert len(w) > 0
             assert any("previously matched" in str(warning.message) for warning in w)
 
+    def test_overlap_warning_counts_skipped_events(self, db_with_test_data):
+        """Test that the overlap warning names the group and counts skipped events."""
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            results = db_with_test_data.search_by_device_names({
+                'all_argon': 'argon',  # Matches 1001, 1002, 1007
+                'penumbra': 'penumbra',  # No overlap
+                'argon_cleaner': [['argon', 'cleaner']]  # 1001, 1002 already taken
+            })
+
+        messages = [str(warning.message) for warning in w]
+        assert messages == [
+            "2 events previously matched to other groups were skipped from 'argon_cleaner'"
+        ]
+        assert set(results['search_group']) == {'all_argon', 'penumbra'}
+
     def test_first_match_wins(self, db_with_test_data):
         """Test that events only appear in first matching group."""
         results = db_with_test_data.search_by_device_names({